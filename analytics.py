@@ -0,0 +1,287 @@
+import argparse
+import glob
+import multiprocessing
+import os
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+import meal_store
+import rollups
+
+# Okna średnich kroczących (dni)
+WINDOWS = [7, 30, 90]
+# Energia z 1 g makroskładnika (kcal)
+KCAL_PER_GRAM = {"białko": 4, "tłuszcz": 9, "węglowodany": 4}
+# Dzień spełnia cel, gdy odchylenie od celu nie przekracza tej części celu
+GOAL_TOLERANCE = 0.1
+# Wiersze czytane naraz przy przeliczaniu statystyk wszystkich użytkowników
+FETCH_SIZE = 10_000
+# Górny limit procesów przy przeliczaniu statystyk (tylko z linii poleceń)
+MAX_WORKERS = min(4, os.cpu_count() or 1)
+
+# Dzienne sumy użytkownika z tabeli podsumowań (bez czytania pojedynczych posiłków).
+# Indeks to kolejne dni kalendarzowe od start (lub pierwszego wpisu) do end; dni bez wpisów mają
+# posilki = 0 i puste (NaN) wartości, żeby nie zaniżały średnich.
+def daily_totals(username, start=None, end=None, db_path=meal_store.DB_PATH):
+    end = end or date.today().isoformat()
+    df = meal_store.get_rollups(username, "dzien", start or "0000-00-00", end, db_path=db_path)
+    days = pd.to_datetime(df["klucz"], format="%Y-%m-%d", errors="coerce")
+    df = df.drop(columns="klucz").set_index(days)[days.notna().to_numpy()]
+    if df.empty and start is None:
+        return df
+    calendar = pd.date_range(start or df.index.min(), end, freq="D")
+    df = df.reindex(calendar)
+    df["posilki"] = df["posilki"].fillna(0).astype(int)
+    return df
+
+# Średnie kroczące z dni z wpisami (okna kalendarzowe 7/30/90 dni)
+def rolling_averages(daily, windows=WINDOWS, fields=rollups.FIELDS):
+    out = pd.DataFrame(index=daily.index)
+    for w in windows:
+        rolled = daily[fields].rolling(f"{w}D", min_periods=1).mean()
+        for f in fields:
+            out[f"{f}_{w}d"] = rolled[f]
+    return out
+
+# Udział makroskładników w energii (0-1) z ostatnich days dni
+def macro_ratios(daily, days=30):
+    sums = daily[list(KCAL_PER_GRAM)].tail(days).sum()
+    energy = pd.Series({f: sums[f] * k for f, k in KCAL_PER_GRAM.items()})
+    total = energy.sum()
+    return {f: float(energy[f] / total) if total else 0.0 for f in KCAL_PER_GRAM}
+
+# Długości serii kolejnych dni True: (seria kończąca się na ostatnim dniu, najdłuższa seria)
+def _runs(flags):
+    flags = np.asarray(flags, dtype=bool)
+    if not flags.any():
+        return 0, 0
+    # Numer serii rośnie przy każdym dniu False; długość serii = liczba True w grupie
+    groups = np.cumsum(~flags)
+    lengths = np.bincount(groups[flags])
+    current = int(lengths[groups[-1]]) if flags[-1] else 0
+    return current, int(lengths.max())
+
+# Dni spełniające cele: kalorie i ustawione cele makroskładników w granicach tolerancji
+def goal_days(daily, goals, tolerance=GOAL_TOLERANCE):
+    hit = daily["posilki"] > 0
+    for f, target in goals.items():
+        if target:
+            hit &= (daily[f] - target).abs() <= tolerance * target
+    return hit
+
+def streaks(daily, goals, today=None):
+    today = pd.Timestamp(today or date.today())
+    daily = daily[daily.index <= today]
+    logged = (daily["posilki"] > 0).to_numpy()
+    hit = goal_days(daily, goals).to_numpy()
+    # Dzisiejszy dzień jeszcze trwa - seria liczona do wczoraj nie jest przerwana brakiem wpisów dziś
+    if len(logged) and daily.index[-1] == today and not logged[-1]:
+        logged, hit = logged[:-1], hit[:-1]
+    current, longest = _runs(logged)
+    goal_current, goal_longest = _runs(hit)
+    return {"seria": current, "najdluzsza_seria": longest, "seria_celu": goal_current,
+            "najdluzsza_seria_celu": goal_longest}
+
+# Udział dni z wpisami spełniających cel w ostatnich days dniach
+def adherence(daily, goals, days):
+    recent = daily.tail(days)
+    logged = recent["posilki"] > 0
+    return float(goal_days(recent, goals)[logged].mean()) if logged.any() else 0.0
+
+# Zestawienie dla użytkownika: średnie, proporcje makroskładników, serie i realizacja celu
+def user_summary(daily, goals, today=None):
+    if daily.empty:
+        return None
+    averages = rolling_averages(daily, fields=["kalorie"]).iloc[-1]
+    return {
+        "srednie": {w: float(averages[f"kalorie_{w}d"]) for w in WINDOWS},
+        "makro": macro_ratios(daily),
+        "cel": {w: adherence(daily, goals, w) for w in WINDOWS},
+        **streaks(daily, goals, today),
+        "dni_z_wpisami": int((daily["posilki"] > 0).sum()),
+    }
+
+# Dane wykresu: dzienne kalorie, średnie kroczące i cel. Długie okresy są uśredniane tygodniowo,
+# żeby wykres miał najwyżej kilkaset punktów niezależnie od długości historii.
+def chart_data(daily, goal, days=None, max_points=400):
+    frame = daily[["kalorie"]].join(rolling_averages(daily, fields=["kalorie"]))
+    if days:
+        frame = frame.tail(days)
+    if len(frame) > max_points:
+        frame = frame.resample("W").mean()
+    frame = frame.rename(columns={"kalorie": "Kalorie", **{f"kalorie_{w}d": f"Średnia {w} dni" for w in WINDOWS}})
+    frame["Cel"] = goal
+    return frame
+
+# --- Statystyki wszystkich użytkowników (panel administratora) ---
+
+def _init_schema(conn):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS statystyki_dzienne (
+            data TEXT PRIMARY KEY,
+            uzytkownicy INTEGER NOT NULL,
+            posilki INTEGER NOT NULL,
+            kalorie REAL NOT NULL,
+            białko REAL NOT NULL,
+            tłuszcz REAL NOT NULL,
+            węglowodany REAL NOT NULL
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS analityka_stan (
+            klucz TEXT PRIMARY KEY,
+            wartosc TEXT
+        )
+    ''')
+
+# Sumy dni od since dla grupy użytkowników; wykonywane w osobnym procesie, z własnym połączeniem
+# tylko do odczytu.
+# Wiersze są czytane partiami, więc pamięć nie zależy od długości historii.
+def _user_days(db_path, usernames, since):
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True, timeout=30)
+    days = {}
+    for username in usernames:
+        cur = conn.execute(
+            "SELECT klucz, posilki, " + ", ".join(rollups.FIELDS) + " FROM podsumowania "
+            "WHERE username = ? AND okres = 'dzien' AND typ = ? AND klucz >= ?",
+            (username, rollups.ALL_TYPES, since)
+        )
+        while True:
+            rows = cur.fetchmany(FETCH_SIZE)
+            if not rows:
+                break
+            for day, posilki, *values in rows:
+                bucket = days.setdefault(day, [0, 0] + [0.0] * len(values))
+                bucket[0] += 1
+                bucket[1] += posilki
+                for i, v in enumerate(values):
+                    bucket[i + 2] += v
+    conn.close()
+    return days
+
+def _merge(parts):
+    total = {}
+    for part in parts:
+        for day, values in part.items():
+            bucket = total.setdefault(day, [0] * len(values))
+            for i, v in enumerate(values):
+                bucket[i] += v
+    return total
+
+# Stare pliki data/posilki_<użytkownik>.csv, które nie trafiły jeszcze do bazy (użytkownik
+# nie otworzył dziennika po migracji), są importowane przed przeliczeniem
+def import_legacy_logs(db_path=meal_store.DB_PATH):
+    imported = 0
+    for path in glob.glob(os.path.join(meal_store.DATA_DIR, "posilki_*.csv")):
+        username = os.path.basename(path)[len("posilki_"):-len(".csv")]
+        imported += meal_store.import_csv(username, path, db_path)
+    return imported
+
+# Przeliczenie statystyk dziennych wszystkich użytkowników od ostatnio przetworzonej daty
+# (włącznie - ten dzień mógł dostać nowe wpisy). full=True liczy wszystko od nowa.
+# Domyślnie w bieżącym procesie (tak wywołuje to aplikacja); workers > 1 dzieli użytkowników
+# między co najwyżej MAX_WORKERS procesów. Zwraca liczbę przeliczonych dni.
+def update_admin_stats(workers=1, full=False, db_path=meal_store.DB_PATH):
+    import_legacy_logs(db_path)
+
+    # Znacznik zmian jest zdejmowany przed odczytem danych: zapis, który nastąpi w trakcie
+    # przeliczenia, ustawi go ponownie i zostanie uwzględniony przy następnym wywołaniu
+    def start(conn):
+        _init_schema(conn)
+        return rollups.take_changed_since(conn)
+
+    changed = meal_store.write(start, db_path)
+    try:
+        return _update_admin_stats(workers, full, changed, db_path)
+    except BaseException:
+        if changed is not None:
+            meal_store.write(lambda conn: rollups.mark_changed_since(conn, changed), db_path)
+        raise
+
+# Przeliczenie od ostatnio przetworzonej daty albo od najwcześniejszego dnia zmienionego później
+# (import starego pliku, korekta wartości produktów), jeśli jest wcześniejszy
+def _update_admin_stats(workers, full, changed, db_path):
+    conn = meal_store.get_connection(db_path)
+    row = conn.execute("SELECT wartosc FROM analityka_stan WHERE klucz = 'ostatni_dzien'").fetchone()
+    since = "0000-00-00" if full or row is None else min(row[0], changed or row[0])
+    usernames = [r[0] for r in conn.execute(
+        "SELECT DISTINCT username FROM podsumowania WHERE okres = 'dzien' AND typ = ?", (rollups.ALL_TYPES,)
+    )]
+
+    workers = max(1, min(workers or 1, MAX_WORKERS))
+    groups = [usernames[i::workers * 4] for i in range(workers * 4) if usernames[i::workers * 4]]
+    if workers == 1 or len(groups) <= 1:
+        days = _user_days(db_path, usernames, since)
+    else:
+        # Procesy uruchamiane od zera (spawn), nie przez fork procesu z wątkami i otwartymi połączeniami
+        with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            days = _merge(pool.map(_user_days, [db_path] * len(groups), groups, [since] * len(groups)))
+
+    def job(conn):
+        conn.execute("DELETE FROM statystyki_dzienne WHERE data >= ?", (since,))
+        conn.executemany(
+            "INSERT INTO statystyki_dzienne (data, uzytkownicy, posilki, " + ", ".join(rollups.FIELDS) + ") "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [(day, *values) for day, values in days.items()]
+        )
+        if days:
+            conn.execute(
+                "INSERT INTO analityka_stan (klucz, wartosc) VALUES ('ostatni_dzien', ?) "
+                "ON CONFLICT (klucz) DO UPDATE SET wartosc = excluded.wartosc",
+                (max(days),)
+            )
+
+    meal_store.write(job, db_path)
+    return len(days)
+
+# Statystyki dzienne wszystkich użytkowników (z tabeli utrzymywanej przez update_admin_stats);
+# kolumny "na użytkownika" to średnie na aktywnego użytkownika danego dnia
+def admin_daily(start=None, end=None, db_path=meal_store.DB_PATH):
+    conn = meal_store.get_connection(db_path)
+    if not conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'statystyki_dzienne'"
+    ).fetchone():
+        return pd.DataFrame()
+    cur = conn.execute(
+        "SELECT data, uzytkownicy, posilki, " + ", ".join(rollups.FIELDS) + " FROM statystyki_dzienne "
+        "WHERE data BETWEEN ? AND ? ORDER BY data",
+        (start or "0000-00-00", end or "9999-99-99")
+    )
+    df = pd.DataFrame(cur.fetchall(), columns=["data", "uzytkownicy", "posilki"] + rollups.FIELDS)
+    df = df.set_index(pd.to_datetime(df.pop("data"), format="%Y-%m-%d", errors="coerce"))
+    for f in rollups.FIELDS:
+        df[f"{f}_na_uzytkownika"] = df[f] / df["uzytkownicy"]
+    return df
+
+def admin_summary(days=30, today=None, db_path=meal_store.DB_PATH):
+    today = today or date.today()
+    df = admin_daily((today - timedelta(days=days - 1)).isoformat(), today.isoformat(), db_path)
+    if df.empty:
+        return None
+    return {
+        "dni": len(df),
+        "aktywni_dziennie": float(df["uzytkownicy"].mean()),
+        "posilki": int(df["posilki"].sum()),
+        "kalorie_na_uzytkownika": float(df["kalorie"].sum() / df["uzytkownicy"].sum()),
+        "makro": macro_ratios(df, days),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Statystyki dzienne wszystkich użytkowników")
+    parser.add_argument("--db", default=meal_store.DB_PATH)
+    parser.add_argument("--procesy", type=int, default=MAX_WORKERS,
+                        help=f"liczba procesów (domyślnie i najwyżej {MAX_WORKERS})")
+    parser.add_argument("--od-nowa", action="store_true", help="przeliczenie całej historii")
+    args = parser.parse_args()
+    print(f"Przeliczono {update_admin_stats(args.procesy, args.od_nowa, args.db)} dni.")
+    summary = admin_summary(db_path=args.db)
+    if summary:
+        print(f"Ostatnie 30 dni: średnio {summary['aktywni_dziennie']:.1f} aktywnych użytkowników dziennie, "
+              f"{summary['kalorie_na_uzytkownika']:.0f} kcal na użytkownika")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+import json
+import threading
+import time
+
+import db
+
+# Wspólna pamięć podręczna odpowiedzi API dla wszystkich użytkowników i sesji
+CACHE_PATH = "data/api_cache.db"
+MAX_ENTRIES = 10_000
+# Trafienia żyją tydzień, brak wyniku (np. nieznany kod EAN) tylko dobę
+TTL = 7 * 24 * 3600
+NEGATIVE_TTL = 24 * 3600
+# Co ile zapisów sprawdzamy limit rozmiaru
+EVICT_EVERY = 64
+# Czas ostatniego użycia odświeżamy najwyżej raz na minutę, żeby odczyt nie był zapisem
+TOUCH_INTERVAL = 60
+
+def _init_schema(conn):
+    with conn:
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS cache (
+                namespace TEXT NOT NULL,
+                klucz TEXT NOT NULL,
+                wartosc TEXT,
+                wygasa REAL NOT NULL,
+                ostatnio REAL NOT NULL,
+                PRIMARY KEY (namespace, klucz)
+            )
+        ''')
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_ostatnio ON cache (ostatnio)")
+
+# Ujednolicenie zapytania tekstowego, żeby "Jabłko " i "jabłko" trafiały w ten sam wpis
+def normalize_query(query):
+    return " ".join(str(query).lower().split())
+
+class ApiCache:
+    def __init__(self, db_path=CACHE_PATH, max_entries=MAX_ENTRIES, ttl=TTL, negative_ttl=NEGATIVE_TTL):
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._lock = threading.Lock()
+        self._puts = 0
+        self._stats = {"hits": 0, "negative_hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+
+    def _conn(self):
+        return db.get_connection(self.db_path, _init_schema)
+
+    def _count(self, name, n=1):
+        with self._lock:
+            self._stats[name] += n
+
+    # Zwraca (znaleziono, wartość); wartość None oznacza zapamiętany brak wyniku
+    def get(self, namespace, key):
+        conn = self._conn()
+        row = conn.execute(
+            "SELECT wartosc, wygasa, ostatnio FROM cache WHERE namespace = ? AND klucz = ?",
+            (namespace, key)
+        ).fetchone()
+        now = time.time()
+        if row is None or row[1] < now:
+            self._count("misses")
+            return False, None
+        if now - row[2] > TOUCH_INTERVAL:
+            with conn:
+                conn.execute(
+                    "UPDATE cache SET ostatnio = ? WHERE namespace = ? AND klucz = ?",
+                    (now, namespace, key)
+                )
+        if row[0] is None:
+            self._count("negative_hits")
+            return True, None
+        self._count("hits")
+        return True, json.loads(row[0])
+
+    def put(self, namespace, key, value):
+        now = time.time()
+        ttl = self.ttl if value is not None else self.negative_ttl
+        conn = self._conn()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO cache (namespace, klucz, wartosc, wygasa, ostatnio) VALUES (?, ?, ?, ?, ?)",
+                (namespace, key, None if value is None else json.dumps(value), now + ttl, now)
+            )
+        self._count("stores")
+        with self._lock:
+            self._puts += 1
+            evict = self._puts % EVICT_EVERY == 0
+        if evict:
+            self.evict()
+
+    # Usunięcie przeterminowanych wpisów i najdawniej używanych ponad limit
+    def evict(self):
+        conn = self._conn()
+        with conn:
+            expired = conn.execute("DELETE FROM cache WHERE wygasa < ?", (time.time(),)).rowcount
+            over = conn.execute(
+                "DELETE FROM cache WHERE rowid IN "
+                "(SELECT rowid FROM cache ORDER BY ostatnio DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            ).rowcount
+        self._count("evictions", expired + over)
+
+    # Wartość z pamięci podręcznej albo wynik fetch(), który zostaje zapamiętany.
+    # Wyjątki z fetch() (np. błąd sieci) nie są zapamiętywane.
+    def get_or_fetch(self, namespace, key, fetch):
+        found, value = self.get(namespace, key)
+        if found:
+            return value
+        value = fetch()
+        self.put(namespace, key, value)
+        return value
+
+    def clear(self):
+        conn = self._conn()
+        with conn:
+            conn.execute("DELETE FROM cache")
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        lookups = stats["hits"] + stats["negative_hits"] + stats["misses"]
+        stats["hit_rate"] = (stats["hits"] + stats["negative_hits"]) / lookups if lookups else 0.0
+        return stats
+
+_default = None
+_default_lock = threading.Lock()
+
+def get_cache():
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = ApiCache()
+        return _default
+
+# Statystyki domyślnej pamięci podręcznej (puste, jeśli nie była jeszcze używana)
+def stats():
+    with _default_lock:
+        cache = _default
+    return cache.stats() if cache is not None else {}
@@ -1,83 +1,112 @@
 import streamlit as st
-import pandas as pd
 import os
+from datetime import date, timedelta
 
-# Nazwa pliku z danymi użytkowników
+import analytics
+import metrics
+import user_store
+
+# Stary plik z danymi użytkowników (przenoszony jednorazowo do bazy users.db)
 USERS_FILE = "users.csv"
 
-# Wczytywanie danych użytkowników
+# Przygotowanie bazy użytkowników (raz na proces serwera, nie przy każdym odświeżeniu)
+@st.cache_resource(show_spinner=False)
 def load_users():
-    if not os.path.exists(USERS_FILE):
-        df = pd.DataFrame([
-            {"username": "admin", "password": "password123", "role": "admin"},
-            {"username": "demo", "password": "demo", "role": "user"}
-        ])
-        df.to_csv(USERS_FILE, index=False)
-    return pd.read_csv(USERS_FILE)
+    if not os.path.exists(USERS_FILE) and user_store.count_users() == 0:
+        user_store.add_user("admin", "password123", role="admin")
+        user_store.add_user("demo", "demo", role="user")
+    user_store.migrate_users_csv(USERS_FILE)
 
 # Uwierzytelnienie
+@metrics.timed("app.authenticate")
 def authenticate(username, password):
-    df = load_users()
-    user = df[(df["username"] == username) & (df["password"] == password)]
-    if not user.empty:
-        return user.iloc[0]
-    return None
+    load_users()
+    return user_store.authenticate(username, password)
+
+# Eksport metryk (zmienne METRICS_*) i profilowanie jednego odświeżenia (?profil=1)
+metrics.start_exporters()
+# Parametr jest usuwany od razu, żeby kolejne odświeżenia (także po st.rerun) nie były profilowane;
+# profil jest zapisywany także wtedy, gdy przebieg przerwie st.rerun lub st.stop
+profil = st.query_params.get("profil") == "1"
+if profil:
+    del st.query_params["profil"]
+profiler = metrics.start_profile(profil)
+
+try:
+    # Interfejs logowania
+    st.set_page_config(page_title="Logowanie", layout="centered")
+    st.title("Logowanie do Dziennika Kalorii 🍽️")
 
-# Interfejs logowania
-st.set_page_config(page_title="Logowanie", layout="centered")
-st.title("Logowanie do Dziennika Kalorii 🍽️")
+    if "logged_in" not in st.session_state:
+        st.session_state.logged_in = False
+        st.session_state.username = None
+        st.session_state.role = None
 
-if "logged_in" not in st.session_state:
-    st.session_state.logged_in = False
-    st.session_state.username = None
-    st.session_state.role = None
+    if not st.session_state.logged_in:
+        username = st.text_input("Nazwa użytkownika")
+        password = st.text_input("Hasło", type="password")
 
-if not st.session_state.logged_in:
-    username = st.text_input("Nazwa użytkownika")
-    password = st.text_input("Hasło", type="password")
+        if st.button("Zaloguj"):
+            user = authenticate(username, password)
+            if user is not None:
+                st.session_state.logged_in = True
+                st.session_state.username = user["username"]
+                st.session_state.role = user["role"]
+                st.success(f"Witaj, {username}! Zostałeś zalogowany.")
+                st.rerun()
+            else:
+                st.error("Nieprawidłowa nazwa użytkownika lub hasło.")
 
-    if st.button("Zaloguj"):
-        user = authenticate(username, password)
-        if user is not None:
+        if st.button("Dostęp Demo"):
+            user = authenticate("demo", "demo")
             st.session_state.logged_in = True
             st.session_state.username = user["username"]
             st.session_state.role = user["role"]
-            st.success(f"Witaj, {username}! Zostałeś zalogowany.")
-            st.experimental_rerun()
-        else:
-            st.error("Nieprawidłowa nazwa użytkownika lub hasło.")
-
-    if st.button("Dostęp Demo"):
-        user = authenticate("demo", "demo")
-        st.session_state.logged_in = True
-        st.session_state.username = user["username"]
-        st.session_state.role = user["role"]
-        st.experimental_rerun()
-else:
-    st.success(f"Jesteś zalogowany jako **{st.session_state.username}**.")
-    if st.session_state.role == "admin":
-        st.subheader("Panel Administratora")
-        with st.expander("Zarządzanie użytkownikami"):
-            new_username = st.text_input("Nowa nazwa użytkownika")
-            new_password = st.text_input("Nowe hasło", type="password")
-            new_role = st.selectbox("Rola", ["user", "admin"])
-            if st.button("Dodaj użytkownika"):
-                df = load_users()
-                if new_username in df["username"].values:
-                    st.warning("Ta nazwa użytkownika już istnieje.")
+            st.rerun()
+    else:
+        st.success(f"Jesteś zalogowany jako **{st.session_state.username}**.")
+        if st.session_state.role == "admin":
+            st.subheader("Panel Administratora")
+            with st.expander("Zarządzanie użytkownikami"):
+                new_username = st.text_input("Nowa nazwa użytkownika")
+                new_password = st.text_input("Nowe hasło", type="password")
+                new_role = st.selectbox("Rola", ["user", "admin"])
+                if st.button("Dodaj użytkownika"):
+                    load_users()
+                    if not user_store.add_user(new_username, new_password, role=new_role):
+                        st.warning("Ta nazwa użytkownika już istnieje.")
+                    else:
+                        st.success(f"Dodano nowego użytkownika: **{new_username}**")
+                        st.rerun()
+            with st.expander("📊 Statystyki wszystkich użytkowników"):
+                if st.button("Przelicz statystyki"):
+                    with st.spinner("Przeliczam..."):
+                        dni = analytics.update_admin_stats()
+                    st.success(f"Przeliczono {dni} dni.")
+                summary = analytics.admin_summary()
+                if summary is None:
+                    st.info("Brak statystyk - przelicz je przyciskiem powyżej.")
                 else:
-                    new_user = pd.DataFrame([{"username": new_username, "password": new_password, "role": new_role}])
-                    df = pd.concat([df, new_user], ignore_index=True)
-                    df.to_csv(USERS_FILE, index=False)
-                    st.success(f"Dodano nowego użytkownika: **{new_username}**")
-                    st.experimental_rerun()
-        
-    st.markdown("### Przejdź do aplikacji")
-    if st.button("Otwórz Dziennik Kalorii"):
-        st.switch_page("pages/dziennik_kalorii.py")
+                    st.markdown(f"""
+    Ostatnie {summary['dni']} dni:
+    👥 średnio **{summary['aktywni_dziennie']:.1f}** aktywnych użytkowników dziennie
+    🍽️ **{summary['posilki']}** posiłków, średnio **{summary['kalorie_na_uzytkownika']:.0f} kcal** na użytkownika dziennie
+    """)
+                    stats = analytics.admin_daily((date.today() - timedelta(days=89)).isoformat())
+                    st.line_chart(stats[["kalorie_na_uzytkownika"]].rename(columns={"kalorie_na_uzytkownika": "kcal na użytkownika"}))
+                    st.bar_chart(stats[["uzytkownicy"]].rename(columns={"uzytkownicy": "Aktywni użytkownicy"}))
+            
+        st.markdown("### Przejdź do aplikacji")
+        if st.button("Otwórz Dziennik Kalorii"):
+            st.switch_page("pages/dziennik_kalorii.py")
 
-    if st.button("Wyloguj"):
-        st.session_state.logged_in = False
-        st.session_state.username = None
-        st.session_state.role = None
-        st.experimental_rerun()
+        if st.button("Wyloguj"):
+            st.session_state.logged_in = False
+            st.session_state.username = None
+            st.session_state.role = None
+            st.rerun()
+finally:
+    profile_path = metrics.finish_profile(profiler, "logowanie")
+
+if profile_path:
+    st.caption(f"Profil zapisany: {profile_path}")
@@ -0,0 +1,106 @@
+import argparse
+import os
+import shutil
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+import meal_store
+
+# Archiwum historii posiłków: Parquet podzielony na katalogi użytkownik/miesiąc
+ARCHIVE_DIR = "data/archiwum"
+
+# Typy kolumn: data i godzina jako typy czasu, typ posiłku jako kategoria, liczby float32
+SCHEMA = pa.schema([
+    ("data", pa.date32()),
+    ("czas", pa.time32("s")),
+    ("produkt", pa.string()),
+    ("waga", pa.float32()),
+    ("kalorie", pa.float32()),
+    ("typ", pa.dictionary(pa.int8(), pa.string())),
+    ("białko", pa.float32()),
+    ("tłuszcz", pa.float32()),
+    ("węglowodany", pa.float32()),
+])
+
+# Ramka z dziennika (tekstowe daty i godziny) -> tabela Arrow o zwartych typach
+def to_table(df):
+    df = df[meal_store.COLUMNS]
+    czas = pd.to_datetime(df["czas"], format="%H:%M", errors="coerce")
+    seconds = (czas.dt.hour * 3600 + czas.dt.minute * 60).astype("Int32")
+    columns = {
+        "data": pa.array(pd.to_datetime(df["data"], errors="coerce").dt.date, type=pa.date32()),
+        "czas": pa.array(seconds, type=pa.int32()).cast(pa.time32("s")),
+        "produkt": pa.array(df["produkt"].astype("string"), type=pa.string()),
+        "typ": pa.array(df["typ"].astype("string"), type=pa.string()).dictionary_encode().cast(SCHEMA.field("typ").type),
+    }
+    for col in ["waga", "kalorie", "białko", "tłuszcz", "węglowodany"]:
+        columns[col] = pa.array(pd.to_numeric(df[col], errors="coerce"), type=pa.float32(), from_pandas=True)
+    return pa.table([columns[f.name] for f in SCHEMA], schema=SCHEMA)
+
+def _user_dir(username, archive_dir):
+    return os.path.join(archive_dir, f"username={username}")
+
+# Zapis całej historii użytkownika do archiwum (plik na miesiąc, podmieniany atomowo)
+def archive_user(username, db_path=meal_store.DB_PATH, archive_dir=ARCHIVE_DIR):
+    return write_archive(username, meal_store.load_meals(username, db_path), archive_dir)
+
+def write_archive(username, df, archive_dir=ARCHIVE_DIR):
+    user_dir = _user_dir(username, archive_dir)
+    months = df["data"].astype(str).str[:7]
+    written = set()
+    for month, part in df.groupby(months, sort=True):
+        month_dir = os.path.join(user_dir, f"miesiac={month}")
+        os.makedirs(month_dir, exist_ok=True)
+        path = os.path.join(month_dir, "part-0.parquet")
+        pq.write_table(to_table(part), path + ".tmp", compression="zstd")
+        os.replace(path + ".tmp", path)
+        written.add(f"miesiac={month}")
+    # Miesiące, których już nie ma w dzienniku, usuwamy z archiwum
+    if os.path.isdir(user_dir):
+        for name in os.listdir(user_dir):
+            if name not in written:
+                shutil.rmtree(os.path.join(user_dir, name))
+    return len(written)
+
+# Odczyt archiwum z wyborem kolumn (projekcja) i zakresu dat; nieodczytane kolumny nie są ładowane.
+# Daty graniczne w formacie RRRR-MM-DD; miesiące spoza zakresu są pomijane bez otwierania plików.
+def read_archive(username, columns=None, start=None, end=None, archive_dir=ARCHIVE_DIR):
+    user_dir = _user_dir(username, archive_dir)
+    if not os.path.isdir(user_dir):
+        return pd.DataFrame(columns=columns or meal_store.COLUMNS)
+    dataset = ds.dataset(
+        user_dir, format="parquet", schema=SCHEMA.append(pa.field("miesiac", pa.string())),
+        partitioning=ds.partitioning(pa.schema([("miesiac", pa.string())]), flavor="hive")
+    )
+    filters = []
+    if start:
+        filters.append(ds.field("miesiac") >= start[:7])
+        filters.append(ds.field("data") >= pa.scalar(pd.Timestamp(start).date(), pa.date32()))
+    if end:
+        filters.append(ds.field("miesiac") <= end[:7])
+        filters.append(ds.field("data") <= pa.scalar(pd.Timestamp(end).date(), pa.date32()))
+    expr = None
+    for f in filters:
+        expr = f if expr is None else expr & f
+    table = dataset.to_table(columns=columns or [f.name for f in SCHEMA], filter=expr)
+    return table.to_pandas(types_mapper=_types_mapper, date_as_object=False)
+
+# Godziny jako zwarty typ Arrow zamiast obiektów datetime.time
+def _types_mapper(arrow_type):
+    if pa.types.is_time(arrow_type):
+        return pd.ArrowDtype(arrow_type)
+    return None
+
+def main():
+    parser = argparse.ArgumentParser(description="Archiwum historii posiłków (Parquet)")
+    parser.add_argument("username")
+    parser.add_argument("--db", default=meal_store.DB_PATH)
+    parser.add_argument("--archiwum", default=ARCHIVE_DIR)
+    args = parser.parse_args()
+    print(f"Zapisano {archive_user(args.username, args.db, args.archiwum)} miesięcy.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+# Skrypty pomiarowe uruchamiane z katalogu głównego: python -m benchmarks.<nazwa>
@@ -0,0 +1,91 @@
+import os
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks import synthetic
+
+USERS = 200
+YEARS = 5
+WORKER_COUNTS = [1, 2, 4]
+REPEATS = 5
+
+def per_call(fn, repeats=REPEATS):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        result = fn()
+    return (time.perf_counter() - start) / repeats, result
+
+# Statystyki jednego użytkownika z wieloletnią historią i pełny przebieg strony z wykresem
+def bench_user(username):
+    import analytics
+    import user_store
+    from streamlit.testing.v1 import AppTest
+
+    today = date.today().isoformat()
+    goals = user_store.get_goals(username)
+    daily_s, daily = per_call(lambda: analytics.daily_totals(username, end=today))
+    summary_s, _ = per_call(lambda: analytics.user_summary(daily, goals, today))
+    chart_s, chart = per_call(lambda: analytics.chart_data(daily, goals["kalorie"]))
+    print(f"Użytkownik ({len(daily)} dni): sumy dzienne {daily_s * 1000:.1f} ms, "
+          f"zestawienie {summary_s * 1000:.1f} ms, wykres {chart_s * 1000:.1f} ms ({len(chart)} punktów)")
+
+    at = AppTest.from_file(os.path.join(ROOT, "pages", "dziennik_kalorii.py"), default_timeout=120)
+    at.session_state["logged_in"] = True
+    at.session_state["username"] = username
+    at.run()
+    at.radio[1].set_value("Cała historia")
+    start = time.perf_counter()
+    at.run()
+    print(f"Przebieg strony z wykresem całej historii: {(time.perf_counter() - start) * 1000:.0f} ms")
+
+# Statystyki wszystkich użytkowników: pierwsze przeliczenie i przyrostowe po nowym dniu
+def bench_admin(names):
+    import analytics
+    import meal_store
+    for workers in WORKER_COUNTS:
+        start = time.perf_counter()
+        days = analytics.update_admin_stats(workers, full=True)
+        full_s = time.perf_counter() - start
+        print(f"{workers} proc.: pełne przeliczenie {days} dni w {full_s:.2f} s")
+
+    tomorrow = (date.today() + timedelta(days=1)).isoformat()
+    for name in names[:10]:
+        meal_store.add_meal(name, dict(zip(synthetic.COLUMNS, [tomorrow, "08:00", "Owsianka", 100, 370,
+                                                                "Śniadanie", 13.0, 7.0, 60.0])))
+    start = time.perf_counter()
+    days = analytics.update_admin_stats(WORKER_COUNTS[-1])
+    print(f"Przyrostowo po nowych wpisach: {days} dni w {time.perf_counter() - start:.2f} s")
+
+    # Kontrola: sumy z tabeli statystyk zgodne z dziennikiem
+    conn = meal_store.get_connection()
+    raw = conn.execute("SELECT COUNT(*), SUM(kalorie) FROM posilki").fetchone()
+    stats = conn.execute("SELECT SUM(posilki), SUM(kalorie) FROM statystyki_dzienne").fetchone()
+    print(f"Posiłki w dzienniku / w statystykach: {raw[0]} / {stats[0]}, "
+          f"różnica kalorii: {abs(raw[1] - stats[1]):.3f}")
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        names, rows = synthetic.generate(tmp, USERS, YEARS)
+        print(f"Wygenerowano {rows} posiłków {USERS} użytkowników w {time.perf_counter() - start:.1f} s")
+        cwd = os.getcwd()
+        os.chdir(tmp)
+        try:
+            import analytics
+            import meal_store
+            start = time.perf_counter()
+            analytics.import_legacy_logs()
+            print(f"Import plików CSV: {time.perf_counter() - start:.1f} s")
+            bench_user(names[0])
+            bench_admin(names)
+            meal_store.close_connections()
+        finally:
+            os.chdir(cwd)
+
+if __name__ == "__main__":
+    main()
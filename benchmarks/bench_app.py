@@ -0,0 +1,256 @@
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks import synthetic
+from benchmarks.fake_api import start_fake_server
+
+# Pomiar aplikacji bez przeglądarki na syntetycznych danych. Strony są uruchamiane przez
+# streamlit.testing (AppTest), a czasy load_data, save_data i authenticate pochodzą z ich
+# własnych pomiarów w metrics. Zewnętrzne API zastępuje lokalny serwer z benchmarks.fake_api.
+REPEATS = 20
+
+def summary(samples):
+    samples = sorted(samples)
+    return {
+        "n": len(samples),
+        "srednia_ms": statistics.fmean(samples) * 1000,
+        "p50_ms": samples[len(samples) // 2] * 1000,
+        "p95_ms": samples[min(len(samples) - 1, int(len(samples) * 0.95))] * 1000,
+        "max_ms": samples[-1] * 1000,
+    }
+
+def timed(fn, repeats=REPEATS):
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return summary(samples)
+
+# Średni czas z pomiarów metrics od ostatniego metrics.reset()
+def span_summary(name):
+    import metrics
+    span = metrics.spans().get(name)
+    if not span:
+        return None
+    return {"n": span["count"], "srednia_ms": span["sum"] / span["count"] * 1000, "max_ms": span["max"] * 1000}
+
+def app_test(page):
+    from streamlit.testing.v1 import AppTest
+    at = AppTest.from_file(os.path.join(ROOT, page), default_timeout=300)
+    at.secrets["api_keys"] = {
+        "image_recognition_key": "klucz", "nutritionix_app_id": "id", "nutritionix_app_key": "klucz"
+    }
+    return at
+
+# Przebieg strony; wyjątek zgłoszony przez stronę przerywa pomiar
+def run_page(at):
+    at.run()
+    if at.exception:
+        raise RuntimeError(f"Strona zgłosiła wyjątek: {at.exception[0].message}")
+    return at
+
+def logged_in(page, username):
+    at = app_test(page)
+    at.session_state["logged_in"] = True
+    at.session_state["username"] = username
+    at.session_state["role"] = "user"
+    return at
+
+# Logowanie przez stronę app.py: pierwsze (z migracją users.csv) i kolejne
+def bench_login(username, password, repeats):
+    import metrics
+    results = {}
+    for label, n in [("pierwsze", 1), ("kolejne", repeats)]:
+        metrics.reset()
+        for _ in range(n):
+            at = run_page(app_test("app.py"))
+            at.text_input[0].input(username)
+            at.text_input[1].input(password)
+            at.button[0].click()
+            run_page(at)
+        results[label] = span_summary("app.authenticate")
+    return results
+
+# Strona dziennika: pierwsze otwarcie (import starego CSV), kolejne odświeżenia i zapis posiłku
+def bench_page(username, repeats):
+    import metrics
+    results = {}
+    metrics.reset()
+    at = logged_in("pages/dziennik_kalorii.py", username)
+    start = time.perf_counter()
+    run_page(at)
+    results["pierwsze_otwarcie_ms"] = (time.perf_counter() - start) * 1000
+    results["load_data_pierwsze"] = span_summary("dziennik.load_data")
+
+    metrics.reset()
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        run_page(at)
+        samples.append(time.perf_counter() - start)
+    results["odswiezenie"] = summary(samples)
+    results["load_data"] = span_summary("dziennik.load_data")
+    results["lista_posilkow"] = span_summary("meal_list.render")
+
+    metrics.reset()
+    for i in range(repeats):
+        at = run_page(logged_in("pages/dziennik_kalorii.py", username))
+        at.text_input[0].input(f"Produkt testowy {i}")
+        at.number_input[0].set_value(150)
+        at.number_input[1].set_value(300)
+        at.button[0].click()
+        run_page(at)
+    results["save_data"] = span_summary("dziennik.save_data")
+    if not results["save_data"] or results["save_data"]["n"] != repeats:
+        raise RuntimeError("Nie wszystkie posiłki zostały zapisane")
+    return results
+
+# Filtrowanie posiłków z dzisiaj: dawny sposób (cały CSV) i zapytanie do bazy
+def bench_today(username, repeats):
+    import pandas as pd
+    import meal_store
+    today = date.today().isoformat()
+    csv_path = meal_store.legacy_csv_path(username)
+
+    def from_csv():
+        df = pd.read_csv(csv_path)
+        return df[df["data"] == today]
+
+    return {
+        "csv": timed(from_csv, repeats),
+        "baza": timed(lambda: meal_store.load_day(username, today), repeats),
+        "suma_dnia": timed(lambda: meal_store.get_rollup(username, "dzien", today), repeats),
+    }
+
+def bench_auth(username, password, repeats):
+    import user_store
+    import utils
+    return {
+        "authenticate": timed(lambda: user_store.authenticate(username, password), repeats),
+        "verify_user": timed(lambda: utils.verify_user(username, password), repeats),
+        "zle_haslo": timed(lambda: user_store.authenticate(username, "zle"), max(1, repeats // 4)),
+        "nieznany_uzytkownik": timed(lambda: user_store.authenticate("nikt", password), max(1, repeats // 4)),
+    }
+
+# Ścieżki API na serwerze zastępczym: zapytania bez pamięci podręcznej i powtórzone
+def bench_api(base_url, repeats):
+    import api_cache
+    import food_api
+    import image_api
+    cache = api_cache.ApiCache("data/bench_api_cache.db")
+    counter = iter(range(10 ** 9))
+    nutritionix = base_url + "/v1_1"
+    image = base_url + "/analyze"
+
+    def barcode():
+        food_api.get_product_by_barcode(f"590{next(counter):010d}", "id", "klucz", nutritionix, cache,
+                                        "data/bench_produkty.db")
+
+    def search():
+        food_api.fetch_search(f"produkt {next(counter)}", "id", "klucz", nutritionix)
+
+    def photo():
+        image_api.analyze_image(next(counter).to_bytes(8, "big"), "klucz", image, cache=cache)
+
+    return {
+        "kod_kreskowy": timed(barcode, repeats),
+        "kod_kreskowy_z_katalogu": timed(
+            lambda: food_api.get_product_by_barcode("5900000000000", "id", "klucz", nutritionix, cache,
+                                                    "data/bench_produkty.db"), repeats),
+        "wyszukiwanie": timed(search, repeats),
+        "zdjecie": timed(photo, repeats),
+        "zdjecie_z_pamieci": timed(
+            lambda: image_api.analyze_image(b"to samo", "klucz", image, cache=cache), repeats),
+    }
+
+def run(users, years, meals_per_day, repeats, api_delay):
+    password = "haslo123"
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        names, rows = synthetic.generate(tmp, users, years, meals_per_day)
+        generated = time.perf_counter() - start
+        server, base_url = start_fake_server(delay=api_delay)
+        cwd = os.getcwd()
+        # Ścieżki danych aplikacji są względne - cały pomiar działa w katalogu tymczasowym
+        os.chdir(tmp)
+        try:
+            import meal_store
+            import metrics
+            results = {
+                "logowanie": bench_login(names[0], password, repeats),
+                "uwierzytelnianie": bench_auth(names[0], password, repeats),
+                "strona": bench_page(names[1 % len(names)], repeats),
+                "dzisiaj": bench_today(names[1 % len(names)], repeats),
+                "api": bench_api(base_url, repeats),
+                "metryki": metrics.collect(),
+            }
+            meal_store.close_connections()
+        finally:
+            os.chdir(cwd)
+            server.shutdown()
+    return {
+        "czas": datetime.now().isoformat(timespec="seconds"),
+        "parametry": {
+            "uzytkownicy": users, "lata": years, "posilki_dziennie": meals_per_day, "powtorzenia": repeats,
+            "opoznienie_api_s": api_delay, "wiersze": rows, "generowanie_s": generated,
+        },
+        "wyniki": results,
+    }
+
+def _flatten(data, prefix=""):
+    out = {}
+    for key, value in data.items():
+        if isinstance(value, dict) and "srednia_ms" not in value:
+            out.update(_flatten(value, f"{prefix}{key}."))
+        elif isinstance(value, dict):
+            out[prefix + key] = value["srednia_ms"]
+        elif key.endswith("_ms"):
+            out[prefix + key] = value
+    return out
+
+# Porównanie dwóch plików wyników (średnie czasy)
+def compare(old_path, new_path):
+    with open(old_path, encoding="utf-8") as f:
+        old = _flatten({k: v for k, v in json.load(f)["wyniki"].items() if k != "metryki"})
+    with open(new_path, encoding="utf-8") as f:
+        new = _flatten({k: v for k, v in json.load(f)["wyniki"].items() if k != "metryki"})
+    print(f"{'pomiar':<45} {'przed [ms]':>11} {'po [ms]':>10} {'zmiana':>8}")
+    for key in sorted(set(old) | set(new)):
+        a, b = old.get(key), new.get(key)
+        change = f"{(b / a - 1) * 100:+.0f}%" if a and b is not None else ""
+        print(f"{key:<45} {a if a is not None else float('nan'):>11.2f} "
+              f"{b if b is not None else float('nan'):>10.2f} {change:>8}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Pomiar aplikacji na syntetycznych danych (bez przeglądarki)")
+    parser.add_argument("--uzytkownicy", type=int, default=10)
+    parser.add_argument("--lata", type=int, default=3)
+    parser.add_argument("--posilki", type=int, default=4, help="posiłków dziennie")
+    parser.add_argument("--powtorzenia", type=int, default=REPEATS)
+    parser.add_argument("--opoznienie-api", type=float, default=0.05, help="opóźnienie serwera zastępczego [s]")
+    parser.add_argument("--wynik", default="bench_app.json", help="plik JSON z wynikami")
+    parser.add_argument("--porownaj", nargs=2, metavar=("PRZED", "PO"), help="porównanie dwóch plików wyników")
+    args = parser.parse_args()
+
+    if args.porownaj:
+        compare(*args.porownaj)
+        return
+    result = run(args.uzytkownicy, args.lata, args.posilki, args.powtorzenia, args.opoznienie_api)
+    with open(args.wynik, "w", encoding="utf-8") as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+    for key, value in sorted(_flatten({k: v for k, v in result["wyniki"].items() if k != "metryki"}).items()):
+        print(f"{key:<45} {value:>10.2f} ms")
+    print(f"Wyniki zapisane w {args.wynik}")
+
+if __name__ == "__main__":
+    main()
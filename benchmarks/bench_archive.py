@@ -0,0 +1,89 @@
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import archive
+
+ROWS = 1_000_000
+MEAL_TYPES = ["Śniadanie", "Obiad", "Kolacja", "Przekąska", "Inne"]
+PRODUCTS = [f"produkt {i}" for i in range(2000)]
+
+# Dziennik obejmuje 5 lat (60 plików miesięcznych), niezależnie od liczby wierszy
+DAYS = 5 * 365
+
+# Syntetyczny dziennik w formacie CSV aplikacji
+def make_log(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    days = pd.Timestamp("2020-01-01") + pd.to_timedelta(np.arange(rows) * DAYS // rows, unit="D")
+    minutes = rng.integers(6 * 60, 23 * 60, rows)
+    return pd.DataFrame({
+        "data": days.strftime("%Y-%m-%d"),
+        "czas": [f"{m // 60:02d}:{m % 60:02d}" for m in minutes],
+        "produkt": rng.choice(PRODUCTS, rows),
+        "waga": rng.integers(10, 500, rows),
+        "kalorie": rng.integers(10, 900, rows),
+        "typ": rng.choice(MEAL_TYPES, rows),
+        "białko": rng.uniform(0, 60, rows).round(1),
+        "tłuszcz": rng.uniform(0, 50, rows).round(1),
+        "węglowodany": rng.uniform(0, 120, rows).round(1),
+    })
+
+# Szczytowe RSS bieżącego procesu w MB (VmHWM nie jest dziedziczone po procesie nadrzędnym)
+def peak_rss():
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+# Pomiar w osobnym procesie, żeby szczytowe RSS dotyczyło tylko danego odczytu
+def measure(kind, path):
+    baseline = peak_rss()
+    start = time.perf_counter()
+    if kind == "csv":
+        df = pd.read_csv(path)
+    elif kind == "csv-kalorie":
+        df = pd.read_csv(path, usecols=["data", "kalorie"])
+    elif kind == "parquet":
+        df = archive.read_archive("bench", archive_dir=path)
+    else:
+        df = archive.read_archive("bench", columns=["data", "kalorie"], archive_dir=path)
+    elapsed = time.perf_counter() - start
+    rss = peak_rss() - baseline
+    print(f"{elapsed:.3f} {rss:.0f} {df.memory_usage(deep=True).sum() / 1e6:.0f}")
+
+def run(kind, path):
+    out = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_archive", "measure", kind, path],
+        capture_output=True, text=True, check=True
+    ).stdout.split()
+    return float(out[0]), float(out[1]), float(out[2])
+
+def main():
+    if len(sys.argv) == 4 and sys.argv[1] == "measure":
+        measure(sys.argv[2], sys.argv[3])
+        return
+    with tempfile.TemporaryDirectory() as tmp:
+        df = make_log(ROWS)
+        csv_path = os.path.join(tmp, "posilki_bench.csv")
+        archive_dir = os.path.join(tmp, "archiwum")
+        df.to_csv(csv_path, index=False)
+        archive.write_archive("bench", df, archive_dir)
+        del df
+        size = sum(os.path.getsize(os.path.join(d, f)) for d, _, fs in os.walk(archive_dir) for f in fs)
+        print(f"{ROWS} wierszy: CSV {os.path.getsize(csv_path) / 1e6:.0f} MB, Parquet {size / 1e6:.0f} MB")
+        print(f"{'odczyt':>22} {'czas [s]':>9} {'+RSS [MB]':>9} {'ramka [MB]':>11}")
+        for kind, path in [("csv", csv_path), ("csv-kalorie", csv_path),
+                           ("parquet", archive_dir), ("parquet-kalorie", archive_dir)]:
+            elapsed, rss, frame = run(kind, path)
+            print(f"{kind:>22} {elapsed:>9.3f} {rss:>9.0f} {frame:>11.0f}")
+
+if __name__ == "__main__":
+    main()
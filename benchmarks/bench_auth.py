@@ -0,0 +1,39 @@
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import user_store
+
+ROUNDS = [10, 11, 12, 13]
+USERS = 200
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, "users.csv")
+        with open(csv_path, "w", encoding="utf-8") as f:
+            f.write("username,password,role\n")
+            for i in range(USERS):
+                f.write(f"user{i},haslo{i},user\n")
+        start = time.perf_counter()
+        added = user_store.migrate_users_csv(csv_path, os.path.join(tmp, "migracja.db"), rounds=10)
+        print(f"migracja {added} użytkowników (koszt 10): {time.perf_counter() - start:.2f} s")
+
+        print(f"{'koszt':>6} {'logowanie [ms]':>15} {'ponowne [µs]':>13}")
+        for rounds in ROUNDS:
+            user_store.BCRYPT_ROUNDS = rounds
+            db_path = os.path.join(tmp, f"users_{rounds}.db")
+            user_store.add_user("bench", "haslo", db_path=db_path)
+            start = time.perf_counter()
+            assert user_store.authenticate("bench", "haslo", db_path)
+            first = time.perf_counter() - start
+            start = time.perf_counter()
+            for _ in range(100):
+                user_store.authenticate("bench", "haslo", db_path)
+            again = (time.perf_counter() - start) / 100
+            print(f"{rounds:>6} {first * 1000:>15.1f} {again * 1e6:>13.1f}")
+
+if __name__ == "__main__":
+    main()
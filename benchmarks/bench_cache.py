@@ -0,0 +1,40 @@
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import api_cache
+import food_api
+from benchmarks.fake_api import start_fake_server
+
+# Opóźnienie serwera zastępczego odpowiadające typowemu czasowi odpowiedzi API
+API_DELAY = 0.2
+REPEATS = 1000
+
+def timed(fn):
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+def main():
+    server, base_url = start_fake_server(delay=API_DELAY)
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = api_cache.ApiCache(os.path.join(tmp, "cache.db"))
+        products = os.path.join(tmp, "produkty.db")
+        search = lambda: food_api.search_product_online("jabłko", "id", "key", base_url, cache, products)
+        barcode = lambda: food_api.get_product_by_barcode("5900000000001", "id", "key", base_url, cache, products)
+        missing = lambda: food_api.get_product_by_barcode("0001", "id", "key", base_url, cache, products)
+
+        for name, fn in [("wyszukiwanie", search), ("kod EAN", barcode), ("nieznany EAN", missing)]:
+            first = timed(fn)
+            repeat = sum(timed(fn) for _ in range(REPEATS)) / REPEATS
+            print(f"{name:>14}: pierwsze {first * 1000:8.1f} ms, powtórne {repeat * 1e6:8.1f} µs")
+
+        print(f"zapytania do serwera: {server.requests}")
+        print(f"statystyki: {cache.stats()}")
+    server.shutdown()
+
+if __name__ == "__main__":
+    main()
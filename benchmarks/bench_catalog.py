@@ -0,0 +1,46 @@
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import catalog
+
+PRODUCTS = 1_000_000
+REPEATS = 200
+QUERIES = ["jabłko", "pierś z kurczaka", "losos wedz", "ser zolty", "jablkko", "mleko 2%"]
+
+WORDS = [
+    "jabłko", "gruszka", "śliwka", "pierś", "kurczaka", "łosoś", "wędzony", "ser", "żółty",
+    "mleko", "jogurt", "naturalny", "chleb", "żytni", "masło", "orzechowe", "makaron",
+    "pełnoziarnisty", "ryż", "brązowy", "szynka", "wiejska", "twaróg", "chudy", "sok",
+    "pomarańczowy", "płatki", "owsiane", "baton", "czekoladowy", "kiełbasa", "pomidor",
+]
+
+def make_products(n, seed=0):
+    rnd = random.Random(seed)
+    for i in range(n):
+        name = " ".join(rnd.sample(WORDS, rnd.randint(2, 4))) + f" {i % 997}"
+        yield {"nazwa": name, "kod": str(5900000000000 + i), "kalorie": rnd.randint(20, 600)}
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "produkty.db")
+        start = time.perf_counter()
+        catalog.add_products(make_products(PRODUCTS), "bench", db_path)
+        print(f"import {PRODUCTS} produktów: {time.perf_counter() - start:.1f} s")
+        for query in QUERIES:
+            start = time.perf_counter()
+            for _ in range(REPEATS):
+                results = catalog.search(query, db_path=db_path)
+            elapsed = (time.perf_counter() - start) / REPEATS
+            print(f"{query!r:>22}: {elapsed * 1000:6.2f} ms, wyników {len(results)}")
+        start = time.perf_counter()
+        for i in range(REPEATS):
+            catalog.get_by_barcode(str(5900000000000 + i * 4999), db_path)
+        print(f"{'kod EAN':>22}: {(time.perf_counter() - start) / REPEATS * 1000:6.2f} ms")
+
+if __name__ == "__main__":
+    main()
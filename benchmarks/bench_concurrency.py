@@ -0,0 +1,56 @@
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import meal_store
+import rollups
+import write_queue
+from benchmarks.bench_save import make_row
+
+THREADS = [1, 4, 16, 64]
+SAVES_PER_THREAD = 200
+USERS = 8
+
+# N wątków naraz zapisuje posiłki (jak wiele sesji Streamlit w jednym procesie);
+# na końcu sprawdzamy, że żaden zapis nie zginął, a podsumowania zgadzają się z dziennikiem
+def stress(db_path, threads):
+    barrier = threading.Barrier(threads)
+
+    def worker(n):
+        username = f"user{n % USERS}"
+        barrier.wait()
+        for i in range(SAVES_PER_THREAD):
+            meal_store.add_meal(username, make_row(n * SAVES_PER_THREAD + i), db_path)
+        meal_store.close_connections()
+
+    pool = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    start = time.perf_counter()
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    conn = meal_store.get_connection(db_path)
+    saved = conn.execute("SELECT COUNT(*) FROM posilki").fetchone()[0]
+    drift = rollups.verify(conn)
+    return elapsed, saved, drift
+
+def main():
+    print(f"{'wątki':>6} {'zapisów':>8} {'zapisano':>9} {'zapisy/s':>9} {'partia':>7} {'rozbieżności':>13}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for threads in THREADS:
+            db_path = os.path.join(tmp, f"posilki_{threads}.db")
+            elapsed, saved, drift = stress(db_path, threads)
+            expected = threads * SAVES_PER_THREAD
+            batch = write_queue.get_writer(db_path).stats()["avg_batch"]
+            print(f"{threads:>6} {expected:>8} {saved:>9} {expected / elapsed:>9.0f} {batch:>7.1f} {len(drift):>13}")
+            assert saved == expected and not drift
+        meal_store.close_connections()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+import asyncio
+import os
+import sys
+import time
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import http_client
+from benchmarks.fake_api import start_fake_server
+
+REPEATS = 200
+PAYLOAD = {"query": "jabłko", "appId": "id", "appKey": "key"}
+
+def per_call(fn):
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        fn()
+    return (time.perf_counter() - start) / REPEATS * 1000
+
+def main():
+    server, base_url = start_fake_server()
+    url = f"{base_url}/v1_1/search/items"
+    client = http_client.HttpClient(backoff=0.01)
+
+    fresh = per_call(lambda: requests.post(url, json=PAYLOAD, timeout=10))
+    pooled = per_call(lambda: client.post(url, json=PAYLOAD, timeout=10))
+    print(f"nowe połączenie: {fresh:.2f} ms, pula połączeń: {pooled:.2f} ms")
+
+    # Dwa zapytania po 200 ms: po kolei i równolegle
+    server.delay = 0.2
+    start = time.perf_counter()
+    client.post(url, json=PAYLOAD, timeout=10)
+    client.post(f"{base_url}/v1_1/item", json={"upc": "590"}, timeout=10)
+    sequential = time.perf_counter() - start
+    start = time.perf_counter()
+    http_client.run_parallel(
+        lambda: client.post(url, json=PAYLOAD, timeout=10),
+        lambda: client.post(f"{base_url}/v1_1/item", json={"upc": "590"}, timeout=10),
+    )
+    parallel = time.perf_counter() - start
+    print(f"kod + wyszukiwanie: po kolei {sequential * 1000:.0f} ms, równolegle {parallel * 1000:.0f} ms")
+
+    async def many():
+        return await asyncio.gather(*(client.apost(url, json=PAYLOAD, timeout=10) for _ in range(8)))
+    start = time.perf_counter()
+    asyncio.run(many())
+    print(f"8 zapytań async: {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    # Awaria serwera: ponowienia, a potem otwarcie bezpiecznika
+    server.delay = 0.0
+    server.fail_status = 503
+    for _ in range(3):
+        try:
+            client.post(url, json=PAYLOAD, timeout=10)
+        except http_client.CircuitOpenError as e:
+            print(f"bezpiecznik: {e}")
+    print(f"statystyki: {client.stats()}")
+    server.shutdown()
+
+if __name__ == "__main__":
+    main()
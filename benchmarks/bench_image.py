@@ -0,0 +1,58 @@
+import base64
+import io
+import os
+import sys
+import tempfile
+import time
+
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import api_cache
+import image_api
+from benchmarks.fake_api import start_fake_server
+
+# Łącze telefonu w górę ~ 2 MB/s
+BANDWIDTH = 2_000_000
+
+# Syntetyczne zdjęcie z telefonu: 4000x3000, szum i gradient, JPEG q95 z EXIF
+def make_photo(width=4000, height=3000):
+    noise = Image.effect_noise((width, height), 60).convert("RGB")
+    gradient = Image.linear_gradient("L").resize((width, height)).convert("RGB")
+    img = Image.blend(noise, gradient, 0.5)
+    exif = Image.Exif()
+    exif[0x0112] = 6  # orientacja: obrót o 90°
+    exif[0x010F] = "Telefon"
+    out = io.BytesIO()
+    img.save(out, format="JPEG", quality=95, exif=exif)
+    return out.getvalue()
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+def main():
+    photo = make_photo()
+    prepared = image_api.preprocess_image(photo)
+    print(f"oryginał: {len(photo) / 1e6:.2f} MB, base64: {len(base64.b64encode(photo)) / 1e6:.2f} MB")
+    print(f"po obróbce: {len(prepared) / 1e3:.0f} kB, base64: {len(base64.b64encode(prepared)) / 1e3:.0f} kB")
+    with Image.open(io.BytesIO(prepared)) as img:
+        print(f"rozmiar {img.size}, EXIF: {dict(img.getexif()) or 'brak'}")
+
+    server, base_url = start_fake_server(bandwidth=BANDWIDTH)
+    url = f"{base_url}/api/v1/analyze"
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = api_cache.ApiCache(os.path.join(tmp, "cache.db"))
+        raw, _ = timed(lambda: image_api.fetch_label(photo, "key", url, "json"))
+        print(f"surowe zdjęcie (base64): {raw * 1000:.0f} ms")
+        for mode in ["json", "multipart"]:
+            cache.clear()
+            first, label = timed(lambda: image_api.analyze_image(photo, "key", url, mode, cache=cache))
+            again, _ = timed(lambda: image_api.analyze_image(photo, "key", url, mode, cache=cache))
+            print(f"{mode:>9}: pierwsze {first * 1000:.0f} ms, ponowne {again * 1e6:.0f} µs ({label})")
+    server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import http_client
+import image_api
+import jobs
+from benchmarks.fake_api import start_fake_server
+
+WORKER_COUNTS = [1, 2, 4, 8, 16]
+JOBS = 64
+API_DELAY = 0.1
+
+# Przepustowość kolejki zadań w tle dla różnej liczby wątków roboczych.
+# Powyżej http_client.MAX_CONCURRENT równoległych zapytań wzrost się zatrzymuje.
+def bench(workers, api_url, tmp):
+    queue = jobs.JobQueue(os.path.join(tmp, f"zadania_{workers}.db"), workers=workers)
+    start = time.perf_counter()
+    ids = [
+        queue.submit("zdjecie", f"{workers}-{i}", lambda i=i: image_api.fetch_label(i.to_bytes(4, "big"), "klucz", api_url))
+        for i in range(JOBS)
+    ]
+    submitted = time.perf_counter() - start
+    results = [queue.wait(job_id, timeout=120) for job_id in ids]
+    elapsed = time.perf_counter() - start
+    failed = sum(1 for job in results if job["status"] != jobs.DONE)
+    return submitted, elapsed, failed
+
+def main():
+    server, base_url = start_fake_server(delay=API_DELAY)
+    api_url = base_url + "/analyze"
+    print(f"{JOBS} zadań, opóźnienie API {API_DELAY * 1000:.0f} ms, "
+          f"limit zapytań klienta HTTP: {http_client.MAX_CONCURRENT}")
+    print(f"{'wątki':>6} {'zlecenie [ms]':>14} {'całość [s]':>11} {'zadania/s':>10} {'błędy':>6}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for workers in WORKER_COUNTS:
+            submitted, elapsed, failed = bench(workers, api_url, tmp)
+            print(f"{workers:>6} {submitted * 1000:>14.1f} {elapsed:>11.2f} {JOBS / elapsed:>10.1f} {failed:>6}")
+    server.shutdown()
+
+if __name__ == "__main__":
+    main()
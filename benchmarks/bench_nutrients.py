@@ -0,0 +1,77 @@
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import meal_store
+import nutrients
+import rollups
+from benchmarks.bench_save import make_row
+
+ENTRIES = 1_000_000
+PRODUCTS = 1_000
+USERS = 10
+
+# Przeliczenie wartości posiłków: pętla po wierszach vs operacja na kolumnach
+def bench_scale(size):
+    rng = np.random.default_rng(0)
+    per_100g = pd.DataFrame(rng.uniform(0, 500, (size, len(nutrients.FIELDS))), columns=nutrients.FIELDS)
+    waga = rng.uniform(10, 500, size)
+
+    sample = min(size, 100_000)
+    records = per_100g.head(sample).assign(na_100g=True).to_dict("records")
+    start = time.perf_counter()
+    for product, w in zip(records, waga[:sample]):
+        nutrients.scale(product, w)
+    loop_s = (time.perf_counter() - start) * size / sample
+
+    start = time.perf_counter()
+    nutrients.meal_values(per_100g, waga)
+    return loop_s, time.perf_counter() - start
+
+# Korekta danych produktów i przeliczenie całej zapisanej historii
+def bench_recalculate(db_path, size):
+    def rows():
+        for i in range(size):
+            row = make_row(i)
+            row["produkt"] = f"produkt {i % PRODUCTS}"
+            row["waga"] = 50 + i % 400
+            yield row
+
+    per_user = size // USERS
+    start = time.perf_counter()
+    for u in range(USERS):
+        meal_store.add_meals(f"user{u}", (r for i, r in zip(range(per_user), rows())), db_path)
+    load_s = time.perf_counter() - start
+
+    corrections = {
+        f"produkt {p}": {"kalorie": 100 + p % 300, "białko": 5.0, "tłuszcz": 3.0, "węglowodany": 15.0}
+        for p in range(PRODUCTS)
+    }
+    start = time.perf_counter()
+    changed, _ = nutrients.recalculate_history(corrections, db_path=db_path)
+    recalc_s = time.perf_counter() - start
+
+    drift = rollups.verify(meal_store.get_connection(db_path))
+    return load_s, changed, recalc_s, len(drift)
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else ENTRIES
+    loop_s, vec_s = bench_scale(size)
+    print(f"Przeliczenie {size} posiłków: pętla {loop_s:.2f} s, wektorowo {vec_s * 1000:.1f} ms")
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "posilki.db")
+        load_s, changed, recalc_s, drift = bench_recalculate(db_path, size)
+        print(f"Zapis historii: {load_s:.1f} s")
+        print(f"Korekta {PRODUCTS} produktów: zmieniono {changed} wpisów w {recalc_s:.1f} s "
+              f"({changed / recalc_s:,.0f} wpisów/s)")
+        print(f"Rozbieżności podsumowań po przeliczeniu: {drift}")
+        meal_store.close_connections()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import meal_store
+from benchmarks.bench_save import make_row
+
+HISTORY_SIZES = [10_000, 100_000, 500_000]
+REPEATS = 50
+DAY = "2000-02-01"
+
+# Czas pobrania posiłków i sum z jednego dnia przy rosnącej historii
+def bench_day(db_path, size):
+    meal_store.add_meals("bench", (make_row(i) for i in range(size)), db_path)
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        meal_store.load_day("bench", DAY, db_path)
+        meal_store.day_totals("bench", DAY, db_path)
+    return (time.perf_counter() - start) / REPEATS
+
+def main():
+    print(f"{'historia':>10} {'dzień [ms]':>11}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in HISTORY_SIZES:
+            db_path = os.path.join(tmp, f"posilki_{size}.db")
+            print(f"{size:>10} {bench_day(db_path, size) * 1000:>11.3f}")
+        meal_store.close_connections()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+from streamlit.testing.v1 import AppTest
+
+from benchmarks.bench_save import make_row
+
+ROW_COUNTS = [10, 100, 1000, 10000]
+REPEATS = 5
+
+# Dawny sposób: st.markdown dla każdego wiersza (dwukrotnie, jak w starej stronie)
+def old_list():
+    import streamlit as st
+    df = st.session_state.df
+    for _ in range(2):
+        for _, row in df.iterrows():
+            st.markdown(f"• 🕒 {row['czas']} – **{row['produkt']}** ({int(row['waga'])}g) – **{int(row['kalorie'])} kcal** | Białko: {row['białko']:.1f}g, Tłuszcz: {row['tłuszcz']:.1f}g, Węglowodany: {row['węglowodany']:.1f}g ({row['typ']})")
+
+def new_list():
+    import meal_list
+    import streamlit as st
+    meal_list.render_meal_list(st.session_state.df)
+
+# Czas pełnego przebiegu skryptu (bez przeglądarki) i liczba wysłanych elementów
+def run(script, df):
+    at = AppTest.from_function(script, default_timeout=120)
+    at.session_state.df = df
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        at.run()
+    elapsed = (time.perf_counter() - start) / REPEATS
+    return elapsed, len(at.main.children)
+
+def main():
+    print(f"{'wiersze':>8} {'stara [ms]':>11} {'elementy':>9} {'nowa [ms]':>10} {'elementy':>9}")
+    for n in ROW_COUNTS:
+        df = pd.DataFrame([make_row(i) for i in range(n)])
+        old_ms, old_el = run(old_list, df)
+        new_ms, new_el = run(new_list, df)
+        print(f"{n:>8} {old_ms * 1000:>11.1f} {old_el:>9} {new_ms * 1000:>10.1f} {new_el:>9}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+import os
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import meal_store
+
+HISTORY_SIZES = [1_000, 10_000, 100_000]
+REPEATS = 20
+MEALS_PER_DAY = 10
+START_DAY = date(2000, 1, 1)
+
+def make_row(i):
+    return {
+        "data": (START_DAY + timedelta(days=i // MEALS_PER_DAY)).isoformat(),
+        "czas": "12:00",
+        "produkt": f"produkt {i}",
+        "waga": 100,
+        "kalorie": 250,
+        "typ": "Obiad",
+        "białko": 10.0,
+        "tłuszcz": 5.0,
+        "węglowodany": 30.0,
+    }
+
+# Stary sposób: wczytanie całego CSV, doklejenie wiersza i przepisanie pliku
+def bench_csv_rewrite(path, size):
+    pd.DataFrame([make_row(i) for i in range(size)]).to_csv(path, index=False)
+    start = time.perf_counter()
+    for i in range(REPEATS):
+        df = pd.read_csv(path)
+        df = pd.concat([df, pd.DataFrame([make_row(size + i)])], ignore_index=True)
+        df.to_csv(path, index=False)
+    return (time.perf_counter() - start) / REPEATS
+
+# Nowy sposób: pojedynczy INSERT w transakcji
+def bench_append(db_path, size):
+    meal_store.add_meals("bench", (make_row(i) for i in range(size)), db_path)
+    start = time.perf_counter()
+    for i in range(REPEATS):
+        meal_store.add_meal("bench", make_row(size + i), db_path)
+    return (time.perf_counter() - start) / REPEATS
+
+def main():
+    print(f"{'historia':>10} {'CSV [ms]':>10} {'SQLite [ms]':>12}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in HISTORY_SIZES:
+            csv_path = os.path.join(tmp, f"posilki_{size}.csv")
+            db_path = os.path.join(tmp, f"posilki_{size}.db")
+            csv_ms = bench_csv_rewrite(csv_path, size) * 1000
+            db_ms = bench_append(db_path, size) * 1000
+            print(f"{size:>10} {csv_ms:>10.2f} {db_ms:>12.3f}")
+        meal_store.close_connections()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Lokalny serwer zastępczy dla Nutritionix i API rozpoznawania zdjęć.
+# Kody EAN zaczynające się od "000" i zapytania "brak" zwracają pusty wynik.
+
+def _food(name):
+    return {
+        "food_name": name,
+        "nf_calories": 250,
+        "nf_protein": 10.0,
+        "nf_total_fat": 5.0,
+        "nf_total_carbohydrate": 30.0,
+    }
+
+class FakeApiHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, body):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        server = self.server
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        with server.lock:
+            server.requests[self.path] = server.requests.get(self.path, 0) + 1
+        if server.delay:
+            time.sleep(server.delay)
+        if server.bandwidth:
+            # Symulacja wolnego łącza: czas przesyłu proporcjonalny do rozmiaru zapytania
+            time.sleep(len(body) / server.bandwidth)
+        with server.lock:
+            fail = server.fail_status and server.fail_times != 0
+            if fail and server.fail_times:
+                server.fail_times -= 1
+        if fail:
+            self._send(server.fail_status, {"error": "fake failure"})
+            return
+        payload = json.loads(body) if self.headers.get("Content-Type", "").startswith("application/json") else {}
+
+        if self.path.endswith("/item"):
+            upc = str(payload.get("upc", ""))
+            foods = [] if upc.startswith("000") else [_food(f"Produkt {upc}")]
+            self._send(200, {"foods": foods})
+        elif self.path.endswith("/search/items"):
+            query = payload.get("query", "")
+            hits = [] if query == "brak" else [
+                {"fields": {"item_name": f"{query} {i}", **{k: v for k, v in _food(query).items() if k != "food_name"}}}
+                for i in range(5)
+            ]
+            self._send(200, {"hits": hits})
+        elif self.path.endswith("/analyze"):
+            self._send(200, {"labels": [{"name": "jabłko", "score": 0.9}]})
+        else:
+            self._send(404, {"error": "not found"})
+
+# Uruchomienie serwera w wątku w tle; zwraca (serwer, adres bazowy)
+def start_fake_server(delay=0.0, port=0, bandwidth=None):
+    server = ThreadingHTTPServer(("127.0.0.1", port), FakeApiHandler)
+    server.daemon_threads = True
+    server.delay = delay
+    server.bandwidth = bandwidth
+    server.fail_status = None
+    # Liczba zapytań, które mają zwrócić fail_status (None - wszystkie)
+    server.fail_times = None
+    server.requests = {}
+    server.lock = threading.Lock()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
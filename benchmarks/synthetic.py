@@ -0,0 +1,88 @@
+import argparse
+import csv
+import os
+import random
+from datetime import date, timedelta
+
+# Syntetyczni użytkownicy i wieloletnie dzienniki w formatach plików aplikacji:
+# users.csv (username,password,role) i data/posilki_<użytkownik>.csv (kolumny dziennika)
+COLUMNS = ["data", "czas", "produkt", "waga", "kalorie", "typ", "białko", "tłuszcz", "węglowodany"]
+PRODUCTS = [
+    # nazwa, kcal / białko / tłuszcz / węglowodany na 100 g
+    ("Owsianka", 370, 13.0, 7.0, 60.0),
+    ("Jabłko", 52, 0.3, 0.2, 14.0),
+    ("Banan", 89, 1.1, 0.3, 23.0),
+    ("Pierś z kurczaka", 165, 31.0, 3.6, 0.0),
+    ("Ryż biały", 130, 2.7, 0.3, 28.0),
+    ("Makaron", 158, 5.8, 0.9, 31.0),
+    ("Jogurt naturalny", 61, 3.5, 3.3, 4.7),
+    ("Chleb żytni", 259, 8.5, 3.3, 48.0),
+    ("Ser żółty", 356, 25.0, 27.0, 1.3),
+    ("Jajko", 155, 13.0, 11.0, 1.1),
+    ("Łosoś", 208, 20.0, 13.0, 0.0),
+    ("Ziemniaki", 77, 2.0, 0.1, 17.0),
+]
+MEALS = [("Śniadanie", 6, 9), ("Obiad", 12, 15), ("Kolacja", 18, 21), ("Przekąska", 10, 22)]
+
+def user_names(count, prefix="user"):
+    return [f"{prefix}{i:04d}" for i in range(count)]
+
+def write_users_csv(path, usernames, password="haslo123"):
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["username", "password", "role"])
+        writer.writerow(["admin", "password123", "admin"])
+        for name in usernames:
+            writer.writerow([name, password, "user"])
+
+# Dziennik jednego użytkownika: meals_per_day posiłków dziennie przez days dni kończących się na end
+def meal_rows(days, meals_per_day=4, end=None, seed=0):
+    rng = random.Random(seed)
+    end = end or date.today()
+    for d in range(days - 1, -1, -1):
+        day = (end - timedelta(days=d)).isoformat()
+        times = sorted(
+            (rng.randint(start, stop), typ) for typ, start, stop in
+            (MEALS[i % len(MEALS)] for i in range(meals_per_day))
+        )
+        for hour, typ in times:
+            name, kcal, protein, fat, carbs = rng.choice(PRODUCTS)
+            waga = rng.randrange(50, 400, 10)
+            k = waga / 100
+            yield [day, f"{hour:02d}:{rng.randrange(0, 60, 5):02d}", name, waga, round(kcal * k),
+                   typ, round(protein * k, 1), round(fat * k, 1), round(carbs * k, 1)]
+
+def write_meal_csv(path, days, meals_per_day=4, end=None, seed=0):
+    count = 0
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(COLUMNS)
+        for row in meal_rows(days, meals_per_day, end, seed):
+            writer.writerow(row)
+            count += 1
+    return count
+
+# Cały zestaw danych w katalogu root: users.csv i data/posilki_<użytkownik>.csv
+def generate(root, users=10, years=3, meals_per_day=4, end=None):
+    os.makedirs(os.path.join(root, "data"), exist_ok=True)
+    names = user_names(users)
+    write_users_csv(os.path.join(root, "users.csv"), names)
+    rows = 0
+    for i, name in enumerate(names):
+        rows += write_meal_csv(
+            os.path.join(root, "data", f"posilki_{name}.csv"), years * 365, meals_per_day, end, seed=i
+        )
+    return names, rows
+
+def main():
+    parser = argparse.ArgumentParser(description="Generator syntetycznych użytkowników i dzienników posiłków")
+    parser.add_argument("katalog")
+    parser.add_argument("--uzytkownicy", type=int, default=10)
+    parser.add_argument("--lata", type=int, default=3)
+    parser.add_argument("--posilki", type=int, default=4, help="posiłków dziennie")
+    args = parser.parse_args()
+    names, rows = generate(args.katalog, args.uzytkownicy, args.lata, args.posilki)
+    print(f"Zapisano {len(names)} użytkowników i {rows} posiłków w {args.katalog}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+import argparse
+import csv
+import json
+import re
+import sys
+from datetime import datetime
+
+import meal_store
+
+# Liczba wierszy w jednej partii importu
+CHUNK_SIZE = 5_000
+
+# Nazwy kolumn z eksportów innych aplikacji -> kolumny dziennika
+COLUMN_ALIASES = {
+    "data": ["data", "date", "day", "Date", "Day"],
+    "czas": ["czas", "time", "Time"],
+    "produkt": ["produkt", "food", "food name", "Food Name", "Food", "name", "Name", "Description"],
+    "waga": ["waga", "amount", "Amount", "grams", "Weight (g)", "weight"],
+    "kalorie": ["kalorie", "calories", "Calories", "Energy (kcal)", "energy_kcal", "kcal"],
+    "typ": ["typ", "meal", "Meal", "Group", "group", "Category"],
+    "białko": ["białko", "protein", "Protein (g)", "Protein"],
+    "tłuszcz": ["tłuszcz", "fat", "Fat (g)", "Fat"],
+    "węglowodany": ["węglowodany", "carbs", "Carbs (g)", "Carbohydrates (g)", "Carbohydrates"],
+}
+
+# Nazwy posiłków z MyFitnessPal / Cronometer -> typy posiłków aplikacji
+MEAL_TYPES = {
+    "breakfast": "Śniadanie",
+    "lunch": "Obiad",
+    "dinner": "Kolacja",
+    "supper": "Kolacja",
+    "snack": "Przekąska",
+    "snacks": "Przekąska",
+}
+APP_MEAL_TYPES = ["Śniadanie", "Obiad", "Kolacja", "Przekąska", "Inne"]
+
+DATE_FORMATS = ["%Y-%m-%d", "%d.%m.%Y", "%m/%d/%Y", "%Y/%m/%d", "%d-%m-%Y"]
+TIME_FORMATS = ["%H:%M", "%H:%M:%S", "%I:%M %p", "%I:%M%p"]
+
+class InvalidRowError(ValueError):
+    pass
+
+def _pick(record, names):
+    for name in names:
+        value = record.get(name)
+        if value not in (None, ""):
+            return value
+    return None
+
+def _parse(value, formats, out_format):
+    value = str(value).strip()
+    for fmt in formats:
+        try:
+            return datetime.strptime(value, fmt).strftime(out_format)
+        except ValueError:
+            continue
+    # Data z godziną, np. "2024-06-15 08:30:00" lub ISO
+    try:
+        return datetime.fromisoformat(value).strftime(out_format)
+    except ValueError:
+        raise InvalidRowError(f"Nieprawidłowa wartość: {value!r}")
+
+def _number(value, default=0.0):
+    if value in (None, ""):
+        return default
+    try:
+        return float(str(value).replace(",", "."))
+    except ValueError:
+        raise InvalidRowError(f"Nieprawidłowa liczba: {value!r}")
+
+# Waga w gramach; Cronometer podaje ilość z jednostką ("40.00 g", "1.00 medium") -
+# gramy są odczytywane, a inne jednostki dają 0 zamiast odrzucenia wiersza
+def _grams(value):
+    if value in (None, ""):
+        return 0.0
+    match = re.fullmatch(r"\s*(\d+(?:[.,]\d+)?)\s*(g|gram|grams|gramy|gramów)?\s*", str(value), re.IGNORECASE)
+    if match is None:
+        return 0.0
+    return float(match.group(1).replace(",", "."))
+
+def _meal_type(value):
+    if not value:
+        return "Inne"
+    value = str(value).strip()
+    if value in APP_MEAL_TYPES:
+        return value
+    return MEAL_TYPES.get(value.lower(), "Inne")
+
+# Ujednolicenie rekordu do schematu dziennika; rzuca InvalidRowError dla błędnych danych
+def normalize_row(record):
+    if not isinstance(record, dict):
+        raise InvalidRowError(f"Oczekiwano obiektu, otrzymano {type(record).__name__}")
+    day = _pick(record, COLUMN_ALIASES["data"])
+    kalorie = _pick(record, COLUMN_ALIASES["kalorie"])
+    if day is None or kalorie is None:
+        raise InvalidRowError("Brak daty lub kalorii")
+    czas = _pick(record, COLUMN_ALIASES["czas"])
+    typ = _meal_type(_pick(record, COLUMN_ALIASES["typ"]))
+    return {
+        "data": _parse(day, DATE_FORMATS, "%Y-%m-%d"),
+        "czas": _parse(czas, TIME_FORMATS, "%H:%M") if czas else "12:00",
+        "produkt": str(_pick(record, COLUMN_ALIASES["produkt"]) or typ).strip(),
+        "waga": _grams(_pick(record, COLUMN_ALIASES["waga"])),
+        "kalorie": _number(kalorie),
+        "typ": typ,
+        "białko": _number(_pick(record, COLUMN_ALIASES["białko"])),
+        "tłuszcz": _number(_pick(record, COLUMN_ALIASES["tłuszcz"])),
+        "węglowodany": _number(_pick(record, COLUMN_ALIASES["węglowodany"])),
+    }
+
+# Strumieniowe czytanie tablicy JSON obiekt po obiekcie (bez wczytywania całego pliku)
+def _iter_json_array(f, buffer_size=1 << 16):
+    decoder = json.JSONDecoder()
+    buf = ""
+    started = False
+    while True:
+        chunk = f.read(buffer_size)
+        buf += chunk
+        while True:
+            buf = buf.lstrip()
+            if not started:
+                if not buf:
+                    break
+                if buf[0] != "[":
+                    raise ValueError("Oczekiwano tablicy JSON")
+                buf = buf[1:]
+                started = True
+                continue
+            buf = buf.lstrip(", \n\r\t")
+            if buf.startswith("]") or not buf:
+                break
+            try:
+                obj, end = decoder.raw_decode(buf)
+            except json.JSONDecodeError:
+                if not chunk:
+                    raise
+                break  # niepełny obiekt - doczytujemy dalej
+            yield obj
+            buf = buf[end:]
+        if not chunk:
+            return
+
+def read_records(path, fmt=None):
+    fmt = fmt or ("jsonl" if path.endswith((".jsonl", ".ndjson")) else "json" if path.endswith(".json") else "csv")
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        if fmt == "csv":
+            yield from csv.DictReader(f)
+        elif fmt == "jsonl":
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            yield from _iter_json_array(f)
+
+# Podział strumienia rekordów na partie poprawnych wierszy; błędne wiersze są liczone w stats
+def _chunks(records, chunk_size, stats):
+    chunk = []
+    for number, record in enumerate(records, start=1):
+        try:
+            chunk.append(normalize_row(record))
+        except InvalidRowError as e:
+            stats["odrzucone"] += 1
+            if len(stats["bledy"]) < 20:
+                stats["bledy"].append(f"wiersz {number}: {e}")
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+# Import pliku CSV/JSON/JSONL w jednej transakcji; pamięć zależy tylko od wielkości partii
+def import_file(username, path, fmt=None, chunk_size=CHUNK_SIZE, db_path=meal_store.DB_PATH):
+    stats = {"dodane": 0, "duplikaty": 0, "odrzucone": 0, "bledy": []}
+    added, skipped = meal_store.add_meal_chunks(
+        username, _chunks(read_records(path, fmt), chunk_size, stats), db_path
+    )
+    stats["dodane"] = added
+    stats["duplikaty"] = skipped
+    return stats
+
+# Strumieniowy eksport dziennika do CSV (format aplikacji) lub JSONL
+def export_file(username, path, start=None, end=None, fmt=None, db_path=meal_store.DB_PATH):
+    fmt = fmt or ("jsonl" if path.endswith((".jsonl", ".ndjson", ".json")) else "csv")
+    rows = meal_store.iter_meals(username, start, end, db_path=db_path)
+    count = 0
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        if fmt == "csv":
+            writer = csv.writer(f)
+            writer.writerow(meal_store.COLUMNS)
+            for row in rows:
+                writer.writerow(row)
+                count += 1
+        else:
+            for row in rows:
+                f.write(json.dumps(dict(zip(meal_store.COLUMNS, row)), ensure_ascii=False) + "\n")
+                count += 1
+    return count
+
+def main():
+    parser = argparse.ArgumentParser(description="Import i eksport dziennika posiłków")
+    parser.add_argument("--db", default=meal_store.DB_PATH)
+    sub = parser.add_subparsers(dest="polecenie", required=True)
+    imp = sub.add_parser("import", help="import z CSV/JSON/JSONL (np. MyFitnessPal, Cronometer)")
+    imp.add_argument("username")
+    imp.add_argument("plik")
+    imp.add_argument("--format", choices=["csv", "json", "jsonl"])
+    imp.add_argument("--partia", type=int, default=CHUNK_SIZE)
+    exp = sub.add_parser("export", help="eksport do CSV lub JSONL")
+    exp.add_argument("username")
+    exp.add_argument("plik")
+    exp.add_argument("--format", choices=["csv", "jsonl"])
+    exp.add_argument("--od", help="data początkowa RRRR-MM-DD")
+    exp.add_argument("--do", help="data końcowa RRRR-MM-DD")
+    args = parser.parse_args()
+
+    if args.polecenie == "import":
+        stats = import_file(args.username, args.plik, args.format, args.partia, args.db)
+        for err in stats["bledy"]:
+            print(err, file=sys.stderr)
+        print(f"Dodano {stats['dodane']}, pominięto duplikatów {stats['duplikaty']}, "
+              f"odrzucono {stats['odrzucone']}.")
+    else:
+        count = export_file(args.username, args.plik, args.od, args.do, args.format, args.db)
+        print(f"Wyeksportowano {count} posiłków.")
+
+if __name__ == "__main__":
+    main()
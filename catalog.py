@@ -0,0 +1,251 @@
+import argparse
+import csv
+import json
+import re
+import unicodedata
+from difflib import SequenceMatcher
+
+import db
+import nutrients
+
+# Lokalny katalog produktów przeszukiwany przed zapytaniem do API
+CATALOG_PATH = "data/produkty.db"
+# Liczba wierszy zapisywanych w jednej transakcji przy imporcie
+CHUNK_SIZE = 10_000
+# Ile kandydatów z indeksu oceniamy; ograniczenie trzyma czas zapytania niezależnym od wielkości katalogu
+CANDIDATES = 300
+# Ile nazw zaczynających się od całego zapytania (w kolejności alfabetycznej, więc najkrótsze
+# i dokładne trafienia najpierw) dokładamy do kandydatów z indeksu pełnotekstowego
+PREFIX_CANDIDATES = 50
+# Minimalne podobieństwo nazwy, żeby wynik przybliżony uznać za trafienie
+FUZZY_THRESHOLD = 0.6
+
+FIELDS = ["kalorie", "białko", "tłuszcz", "węglowodany"]
+
+# Nazwy kolumn rozpoznawane przy imporcie (format aplikacji, Open Food Facts, Nutritionix)
+COLUMN_ALIASES = {
+    "nazwa": ["nazwa", "produkt", "product_name", "item_name", "food_name"],
+    "kod": ["kod", "code", "upc", "ean"],
+    "kalorie": ["kalorie", "energy-kcal_100g", "nf_calories"],
+    "białko": ["białko", "proteins_100g", "nf_protein"],
+    "tłuszcz": ["tłuszcz", "fat_100g", "nf_total_fat"],
+    "węglowodany": ["węglowodany", "carbohydrates_100g", "nf_total_carbohydrate"],
+    "porcja_g": ["porcja_g", "serving_quantity", "nf_serving_weight_grams"],
+}
+# Pola Nutritionix podają wartości na porcję, a nie na 100 g
+PER_SERVING_COLUMNS = ["nf_calories", "nf_protein", "nf_total_fat", "nf_total_carbohydrate"]
+
+# Litery bez rozkładu w Unicode, których nie usuwa normalizacja NFKD
+_FOLD = str.maketrans({"ł": "l", "Ł": "l", "ß": "ss", "ø": "o", "đ": "d"})
+
+# Nazwa bez polskich znaków, małymi literami, np. "Łosoś Wędzony" -> "losos wedzony"
+def fold(text):
+    text = unicodedata.normalize("NFKD", str(text).translate(_FOLD).lower())
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    return " ".join(re.findall(r"\w+", text))
+
+def _init_schema(conn):
+    with conn:
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS produkty (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                nazwa TEXT NOT NULL,
+                nazwa_norm TEXT NOT NULL,
+                kod TEXT NOT NULL DEFAULT '',
+                zrodlo TEXT NOT NULL DEFAULT '',
+                kalorie REAL,
+                białko REAL,
+                tłuszcz REAL,
+                węglowodany REAL,
+                porcja_g REAL,
+                na_100g INTEGER NOT NULL DEFAULT 1,
+                UNIQUE (zrodlo, kod, nazwa)
+            )
+        ''')
+        # Katalog sprzed wprowadzenia wartości na 100 g
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(produkty)")}
+        if "porcja_g" not in columns:
+            conn.execute("ALTER TABLE produkty ADD COLUMN porcja_g REAL")
+            conn.execute("ALTER TABLE produkty ADD COLUMN na_100g INTEGER NOT NULL DEFAULT 1")
+            # Wcześniejsze wyniki z Nutritionix były zapisywane na porcję (bez wagi porcji)
+            conn.execute("UPDATE produkty SET na_100g = 0 WHERE zrodlo = 'nutritionix'")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_produkty_kod ON produkty (kod)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_produkty_nazwa_norm ON produkty (nazwa_norm)")
+        # Indeks pełnotekstowy bez kopii treści, z indeksem prefiksów 2- i 3-literowych
+        conn.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS produkty_fts "
+            "USING fts5(nazwa_norm, content='', prefix='2 3')"
+        )
+        conn.execute('''
+            CREATE TRIGGER IF NOT EXISTS produkty_fts_insert AFTER INSERT ON produkty BEGIN
+                INSERT INTO produkty_fts (rowid, nazwa_norm) VALUES (new.id, new.nazwa_norm);
+            END
+        ''')
+
+def get_connection(db_path=CATALOG_PATH):
+    return db.get_connection(db_path, _init_schema)
+
+def _number(value):
+    if value is None or value == "":
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+def _pick(record, names):
+    for name in names:
+        if name in record and record[name] not in (None, ""):
+            return record[name]
+    return None
+
+# Ujednolicenie rekordu z dowolnego obsługiwanego formatu; None, gdy brak nazwy.
+# Wartości w katalogu są na 100 g (jak w zrzutach Open Food Facts), chyba że rekord
+# ma na_100g = False - wtedy są na porcję. Rekordy Nutritionix (wartości na porcję)
+# są przeliczane na 100 g z wagi porcji, a bez niej zostają na porcję.
+def normalize_record(record, zrodlo=""):
+    nazwa = _pick(record, COLUMN_ALIASES["nazwa"])
+    if not nazwa or not fold(nazwa):
+        return None
+    kod = _pick(record, COLUMN_ALIASES["kod"])
+    values = [_number(_pick(record, COLUMN_ALIASES[f])) for f in FIELDS]
+    porcja_g = _number(_pick(record, COLUMN_ALIASES["porcja_g"]))
+    na_100g = 0 if record.get("na_100g") is False else 1
+    if "na_100g" not in record and any(_pick(record, [c]) is not None for c in PER_SERVING_COLUMNS):
+        product = nutrients.normalize_product({**dict(zip(FIELDS, values)), "porcja_g": porcja_g})
+        values = [product[f] for f in FIELDS]
+        na_100g = 1 if product["na_100g"] else 0
+    return (str(nazwa).strip(), fold(nazwa), str(kod or "").strip(), zrodlo, *values, porcja_g, na_100g)
+
+_INSERT_SQL = (
+    "INSERT OR IGNORE INTO produkty (nazwa, nazwa_norm, kod, zrodlo, " + ", ".join(FIELDS) + ", porcja_g, na_100g) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+
+# Dodanie produktów (słowniki w formacie aplikacji lub źródła); duplikaty są pomijane
+def add_products(records, zrodlo="", db_path=CATALOG_PATH):
+    conn = get_connection(db_path)
+    added = 0
+    chunk = []
+    for record in records:
+        row = normalize_record(record, zrodlo)
+        if row is not None:
+            chunk.append(row)
+        if len(chunk) >= CHUNK_SIZE:
+            added += _insert_chunk(conn, chunk)
+            chunk = []
+    if chunk:
+        added += _insert_chunk(conn, chunk)
+    return added
+
+def _insert_chunk(conn, rows):
+    with conn:
+        return conn.executemany(_INSERT_SQL, rows).rowcount
+
+def _read_json(path):
+    with open(path, encoding="utf-8") as f:
+        if path.endswith((".jsonl", ".ndjson")):
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+            return
+        data = json.load(f)
+    yield from (data.get("products", []) if isinstance(data, dict) else data)
+
+# Import zrzutu CSV/TSV lub JSON/JSONL (np. eksport Open Food Facts), czytany strumieniowo
+def load_file(path, zrodlo="import", db_path=CATALOG_PATH):
+    if path.endswith((".json", ".jsonl", ".ndjson")):
+        return add_products(_read_json(path), zrodlo, db_path)
+    csv.field_size_limit(2**31 - 1)
+    with open(path, encoding="utf-8", newline="") as f:
+        delimiter = "\t" if "\t" in f.readline() else ","
+        f.seek(0)
+        return add_products(csv.DictReader(f, delimiter=delimiter), zrodlo, db_path)
+
+def _to_result(row):
+    return {
+        "nazwa": row[0], "kod": row[1] or None, **dict(zip(FIELDS, row[2:6])),
+        "porcja_g": row[6], "na_100g": bool(row[7])
+    }
+
+_SELECT = "SELECT p.nazwa, p.kod, " + ", ".join("p." + f for f in FIELDS) + ", p.porcja_g, p.na_100g"
+
+def _candidates(conn, match):
+    return conn.execute(
+        _SELECT + ", p.nazwa_norm FROM produkty_fts f JOIN produkty p ON p.id = f.rowid "
+        "WHERE produkty_fts MATCH ? LIMIT ?",
+        (match, CANDIDATES)
+    ).fetchall()
+
+# Nazwy zaczynające się od zapytania, z indeksu nazw; bez tego dokładna nazwa mogłaby nie trafić
+# do kandydatów, gdy słowo występuje w tysiącach dłuższych nazw
+def _prefix_candidates(conn, folded):
+    return conn.execute(
+        _SELECT + ", p.nazwa_norm FROM produkty p "
+        "WHERE p.nazwa_norm >= ? AND p.nazwa_norm < ? ORDER BY p.nazwa_norm LIMIT ?",
+        (folded, folded + "\U0010ffff", PREFIX_CANDIDATES)
+    ).fetchall()
+
+# Ocena kandydatów: nazwa zaczynająca się od zapytania wygrywa, potem podobieństwo nazw
+def _rank(folded, rows, limit, threshold=0.0):
+    scored = []
+    for row in rows:
+        score = SequenceMatcher(None, folded, row[-1]).ratio()
+        if row[-1].startswith(folded):
+            score += 1.0
+        if score >= threshold:
+            scored.append((score, row[:-1]))
+    scored.sort(key=lambda item: -item[0])
+    return [_to_result(r) for _, r in scored[:limit]]
+
+# Wyszukiwanie: najpierw prefiksy słów (bez polskich znaków), potem dopasowanie przybliżone
+def search(query, limit=10, db_path=CATALOG_PATH):
+    folded = fold(query)
+    tokens = folded.split()
+    # Jednoliterowe słowa (np. "z") dopasowują pół katalogu, więc je pomijamy
+    tokens = [t for t in tokens if len(t) > 1] or tokens
+    if not tokens:
+        return []
+    conn = get_connection(db_path)
+    rows = _candidates(conn, " AND ".join(f'"{t}"*' for t in tokens))
+    rows = list(dict.fromkeys(_prefix_candidates(conn, folded) + rows))
+    if rows:
+        return _rank(folded, rows, limit)
+    return fuzzy_search(query, limit, db_path)
+
+# Dopasowanie przybliżone (literówki): kandydaci po początku słów, ocena podobieństwa nazwy
+def fuzzy_search(query, limit=10, db_path=CATALOG_PATH):
+    folded = fold(query)
+    stems = {t[:3] for t in folded.split() if len(t) >= 2}
+    if not stems:
+        return []
+    conn = get_connection(db_path)
+    rows = _candidates(conn, " OR ".join(f'"{s}"*' for s in stems))
+    return _rank(folded, rows, limit, FUZZY_THRESHOLD)
+
+def get_by_barcode(kod, db_path=CATALOG_PATH):
+    conn = get_connection(db_path)
+    row = conn.execute(
+        _SELECT + " FROM produkty p WHERE p.kod = ? LIMIT 1", (str(kod).strip(),)
+    ).fetchone()
+    return _to_result(row) if row else None
+
+def main():
+    parser = argparse.ArgumentParser(description="Lokalny katalog produktów")
+    sub = parser.add_subparsers(dest="polecenie", required=True)
+    load = sub.add_parser("load", help="import zrzutu CSV/JSON")
+    load.add_argument("plik")
+    load.add_argument("--zrodlo", default="import")
+    find = sub.add_parser("search", help="wyszukiwanie produktu")
+    find.add_argument("zapytanie")
+    parser.add_argument("--db", default=CATALOG_PATH)
+    args = parser.parse_args()
+
+    if args.polecenie == "load":
+        print(f"Dodano {load_file(args.plik, args.zrodlo, args.db)} produktów.")
+    else:
+        for item in search(args.zapytanie, db_path=args.db):
+            print(f"{item['nazwa']} - {item['kalorie']} kcal")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+import os
+import sqlite3
+import threading
+import weakref
+
+# Najwięcej wolnych połączeń trzymanych na plik bazy; nadmiarowe są zamykane
+MAX_IDLE = 8
+
+_local = threading.local()
+_lock = threading.Lock()
+# Wolne połączenia wspólne dla procesu: ścieżka bazy -> lista połączeń
+_idle = {}
+# Bazy, dla których wykonano już init_schema: (ścieżka, init_schema)
+_ready = set()
+_schema_lock = threading.Lock()
+
+# Połączenia używane przez jeden wątek; po zakończeniu wątku wracają do puli
+class _Held:
+    def __init__(self):
+        self.conns = {}
+        weakref.finalize(self, _release_all, self.conns)
+
+def _open(db_path):
+    folder = os.path.dirname(db_path)
+    if folder and not os.path.exists(folder):
+        os.makedirs(folder)
+    # Połączenie może przejść do innego wątku, ale naraz używa go tylko jeden
+    conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+    # WAL: zapis dopisuje do dziennika, czytelnicy nie blokują piszących
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+def _release(db_path, conn):
+    try:
+        if conn.in_transaction:
+            conn.rollback()
+    except sqlite3.Error:
+        conn.close()
+        return
+    with _lock:
+        idle = _idle.setdefault(db_path, [])
+        if len(idle) < MAX_IDLE:
+            idle.append(conn)
+            return
+    conn.close()
+
+def _release_all(conns):
+    for db_path, conn in conns.items():
+        _release(db_path, conn)
+    conns.clear()
+
+# Połączenie wątku z plikiem bazy, brane z puli procesu. Streamlit wykonuje każde odświeżenie
+# strony w nowym wątku, więc połączenia są oddawane do puli po zakończeniu wątku i używane
+# przez następne odświeżenia. init_schema jest wywoływane raz na bazę w procesie.
+def get_connection(db_path, init_schema=None):
+    held = getattr(_local, "held", None)
+    if held is None:
+        held = _local.held = _Held()
+    conn = held.conns.get(db_path)
+    if conn is None:
+        with _lock:
+            idle = _idle.get(db_path)
+            conn = idle.pop() if idle else None
+        conn = conn or _open(db_path)
+        held.conns[db_path] = conn
+    if init_schema is not None and (db_path, init_schema) not in _ready:
+        with _schema_lock:
+            if (db_path, init_schema) not in _ready:
+                init_schema(conn)
+                _ready.add((db_path, init_schema))
+    return conn
+
+# Zamknięcie połączeń bieżącego wątku i wolnych połączeń z puli (np. przed usunięciem plików baz)
+def close_connections():
+    held = getattr(_local, "held", None)
+    conns = list(held.conns.values()) if held is not None else []
+    if held is not None:
+        held.conns.clear()
+    with _lock:
+        for idle in _idle.values():
+            conns += idle
+        _idle.clear()
+        _ready.clear()
+    for conn in conns:
+        conn.close()
@@ -0,0 +1,106 @@
+import os
+
+import api_cache
+import catalog
+import http_client
+import metrics
+import nutrients
+
+# Adres API Nutritionix (można nadpisać, np. lokalnym serwerem zastępczym)
+NUTRITIONIX_URL = os.environ.get("NUTRITIONIX_URL", "https://api.nutritionix.com/v1_1")
+
+# Pobranie produktu po kodzie kreskowym; None, gdy API nie zna kodu
+@metrics.timed("food_api.fetch_product_by_barcode")
+def fetch_product_by_barcode(barcode, app_id, app_key, base_url=NUTRITIONIX_URL):
+    headers = {"Content-Type": "application/json"}
+    payload = {
+        "upc": barcode,
+        "appId": app_id,
+        "appKey": app_key
+    }
+    response = http_client.post(f"{base_url}/item", json=payload, headers=headers, timeout=10)
+    response.raise_for_status()
+    data = response.json()
+
+    if "foods" in data and data["foods"]:
+        food = data["foods"][0]
+        return {
+            "produkt": food.get("food_name", "Nieznany produkt"),
+            "kalorie": food.get("nf_calories"),
+            "białko": food.get("nf_protein"),
+            "tłuszcz": food.get("nf_total_fat"),
+            "węglowodany": food.get("nf_total_carbohydrate"),
+            "porcja_g": food.get("nf_serving_weight_grams")
+        }
+    return None
+
+# Wyszukiwanie produktów po nazwie; None, gdy brak wyników
+@metrics.timed("food_api.fetch_search")
+def fetch_search(query, app_id, app_key, base_url=NUTRITIONIX_URL):
+    headers = {"Content-Type": "application/json"}
+    payload = {
+        "appId": app_id,
+        "appKey": app_key,
+        "query": query
+    }
+    response = http_client.post(f"{base_url}/search/items", json=payload, headers=headers, timeout=10)
+    response.raise_for_status()
+    data = response.json()
+
+    if "hits" in data and data["hits"]:
+        results = []
+        for item in data["hits"]:
+            fields = item.get("fields", {})
+            results.append({
+                "nazwa": fields.get("item_name"),
+                "kalorie": fields.get("nf_calories"),
+                "białko": fields.get("nf_protein"),
+                "tłuszcz": fields.get("nf_total_fat"),
+                "węglowodany": fields.get("nf_total_carbohydrate"),
+                "porcja_g": fields.get("nf_serving_weight_grams")
+            })
+        return results
+    return None
+
+# Wersje z lokalnym katalogiem i pamięcią podręczną - API tylko, gdy katalog nie zna produktu,
+# a wyniki z API trafiają do katalogu. Zwracane wartości są na 100 g (na_100g = True), gdy znana
+# jest waga porcji; wartości posiłku liczy nutrients.scale z wagi podanej przez użytkownika.
+def get_product_by_barcode(barcode, app_id, app_key, base_url=NUTRITIONIX_URL, cache=None,
+                           catalog_path=catalog.CATALOG_PATH):
+    local = catalog.get_by_barcode(barcode, catalog_path)
+    if local and local.get("kalorie") is not None:
+        metrics.inc("food_api.catalog_hits")
+        return {"produkt": local["nazwa"], **{k: v for k, v in local.items() if k not in ("nazwa", "kod")}}
+    cache = cache or api_cache.get_cache()
+    product = cache.get_or_fetch(
+        "upc", str(barcode).strip(),
+        lambda: fetch_product_by_barcode(barcode, app_id, app_key, base_url)
+    )
+    if product:
+        product = nutrients.normalize_product(product)
+        catalog.add_products([{**product, "kod": str(barcode).strip()}], "nutritionix", catalog_path)
+    return product
+
+def search_product_online(query, app_id, app_key, base_url=NUTRITIONIX_URL, cache=None,
+                          catalog_path=catalog.CATALOG_PATH):
+    local = [item for item in catalog.search(query, db_path=catalog_path) if item.get("kalorie") is not None]
+    if local:
+        metrics.inc("food_api.catalog_hits")
+        return local
+    cache = cache or api_cache.get_cache()
+    results = cache.get_or_fetch(
+        "search", api_cache.normalize_query(query),
+        lambda: fetch_search(query, app_id, app_key, base_url)
+    )
+    if results:
+        results = [nutrients.normalize_product(item) for item in results]
+        catalog.add_products(results, "nutritionix", catalog_path)
+    return results
+
+# Równoczesne wyszukanie po kodzie kreskowym i po nazwie; zwraca (produkt, wyniki wyszukiwania)
+def lookup(barcode, query, app_id, app_key, base_url=NUTRITIONIX_URL, cache=None,
+           catalog_path=catalog.CATALOG_PATH):
+    return tuple(http_client.run_parallel(
+        lambda: get_product_by_barcode(barcode, app_id, app_key, base_url, cache, catalog_path),
+        lambda: search_product_online(query, app_id, app_key, base_url, cache, catalog_path)
+    ))
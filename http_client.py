@@ -0,0 +1,142 @@
+import asyncio
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Wspólny klient HTTP dla wszystkich zewnętrznych API (Nutritionix, rozpoznawanie zdjęć)
+POOL_SIZE = 10
+# Najwięcej równoległych zapytań wychodzących z całego procesu
+MAX_CONCURRENT = 8
+# Ponowienia z wykładniczym opóźnieniem i losowym rozrzutem
+RETRIES = 3
+BACKOFF = 0.5
+BACKOFF_MAX = 8.0
+RETRY_STATUS = {429, 500, 502, 503, 504}
+# Bezpiecznik: po tylu kolejnych błędach host jest odcinany na BREAKER_COOLDOWN sekund
+BREAKER_FAILURES = 5
+BREAKER_COOLDOWN = 30.0
+
+# Dziedziczy po ConnectionError, więc łapią go istniejące bloki except RequestException
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    pass
+
+class HttpClient:
+    def __init__(self, pool_size=POOL_SIZE, max_concurrent=MAX_CONCURRENT, retries=RETRIES,
+                 backoff=BACKOFF, backoff_max=BACKOFF_MAX, breaker_failures=BREAKER_FAILURES,
+                 breaker_cooldown=BREAKER_COOLDOWN):
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.retries = retries
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self.breaker_failures = breaker_failures
+        self.breaker_cooldown = breaker_cooldown
+        self._slots = threading.BoundedSemaphore(max_concurrent)
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrent, thread_name_prefix="http")
+        self._lock = threading.Lock()
+        # host -> (liczba kolejnych błędów, czas otwarcia bezpiecznika)
+        self._breakers = {}
+        self._stats = {"requests": 0, "retries": 0, "failures": 0, "rejected": 0}
+
+    def _count(self, name):
+        with self._lock:
+            self._stats[name] += 1
+
+    def _check_breaker(self, host):
+        with self._lock:
+            failures, opened = self._breakers.get(host, (0, None))
+            if opened is None:
+                return
+            if time.monotonic() - opened < self.breaker_cooldown:
+                self._stats["rejected"] += 1
+                raise CircuitOpenError(f"Usługa {host} chwilowo niedostępna (zbyt wiele błędów)")
+            # Po czasie ochłonięcia przepuszczamy zapytanie próbne
+            self._breakers[host] = (failures, None)
+
+    def _record(self, host, ok):
+        with self._lock:
+            if ok:
+                self._breakers.pop(host, None)
+                return
+            self._stats["failures"] += 1
+            failures = self._breakers.get(host, (0, None))[0] + 1
+            opened = time.monotonic() if failures >= self.breaker_failures else None
+            self._breakers[host] = (failures, opened)
+
+    def _sleep(self, attempt):
+        delay = min(self.backoff_max, self.backoff * 2 ** attempt)
+        time.sleep(random.uniform(0, delay))
+
+    # Zapytanie z ponowieniami; zwraca ostatnią odpowiedź (raise_for_status należy do wołającego)
+    def request(self, method, url, **kwargs):
+        host = urlsplit(url).netloc
+        for attempt in range(self.retries + 1):
+            self._check_breaker(host)
+            self._count("requests")
+            try:
+                with self._slots:
+                    response = self.session.request(method, url, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                self._record(host, ok=False)
+                if attempt == self.retries:
+                    raise
+            else:
+                if response.status_code not in RETRY_STATUS:
+                    self._record(host, ok=True)
+                    return response
+                self._record(host, ok=False)
+                if attempt == self.retries:
+                    return response
+            self._count("retries")
+            self._sleep(attempt)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    # Wersja asynchroniczna - zapytanie wykonywane w puli wątków klienta
+    async def apost(self, url, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, lambda: self.post(url, **kwargs))
+
+    # Uruchomienie funkcji w tle; zwraca Future
+    def submit(self, fn, *args, **kwargs):
+        return self._executor.submit(fn, *args, **kwargs)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats["open_circuits"] = sum(1 for _, opened in self._breakers.values() if opened is not None)
+        return stats
+
+_default = None
+_default_lock = threading.Lock()
+
+def get_client():
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = HttpClient()
+        return _default
+
+def post(url, **kwargs):
+    return get_client().post(url, **kwargs)
+
+# Statystyki domyślnego klienta (puste, jeśli nie był jeszcze używany)
+def stats():
+    with _default_lock:
+        client = _default
+    return client.stats() if client is not None else {}
+
+# Równoległe wykonanie kilku wywołań, np. wyszukiwania i kodu kreskowego naraz.
+# Zwraca wyniki w kolejności wywołań; wyjątek z dowolnego wywołania jest przekazywany dalej.
+def run_parallel(*calls):
+    client = get_client()
+    futures = [client.submit(call) for call in calls]
+    return [future.result() for future in futures]
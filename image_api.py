@@ -0,0 +1,69 @@
+import base64
+import hashlib
+import io
+import os
+
+from PIL import Image, ImageOps
+
+import api_cache
+import http_client
+import metrics
+
+# Adres API rozpoznawania zdjęć (poniższy adres jest tylko szkieletem)
+IMAGE_API_URL = os.environ.get("IMAGE_API_URL", "https://example.com/api/v1/analyze")
+# Dłuższy bok i jakość JPEG wysyłanego zdjęcia - do rozpoznania posiłku wystarczy ~1000 px
+MAX_EDGE = int(os.environ.get("IMAGE_MAX_EDGE", 1024))
+QUALITY = int(os.environ.get("IMAGE_QUALITY", 80))
+# "json" - obraz w base64 w treści JSON, "multipart" - plik binarny bez narzutu base64
+UPLOAD_MODE = os.environ.get("IMAGE_UPLOAD_MODE", "json")
+
+# Zmniejszenie i ponowne zakodowanie zdjęcia jako JPEG bez metadanych EXIF.
+# Orientacja z EXIF jest najpierw nanoszona na piksele, więc obraz się nie obraca.
+@metrics.timed("image_api.preprocess_image")
+def preprocess_image(image_bytes, max_edge=MAX_EDGE, quality=QUALITY):
+    with Image.open(io.BytesIO(image_bytes)) as img:
+        img = ImageOps.exif_transpose(img)
+        if img.mode != "RGB":
+            img = img.convert("RGB")
+        img.thumbnail((max_edge, max_edge), Image.LANCZOS)
+        out = io.BytesIO()
+        # Nowy obraz nie przenosi info/EXIF oryginału
+        img.save(out, format="JPEG", quality=quality, optimize=True)
+    return out.getvalue()
+
+# Skrót treści zdjęcia - ten sam plik przesłany ponownie trafia w ten sam wpis pamięci podręcznej
+def image_hash(image_bytes):
+    return hashlib.sha256(image_bytes).hexdigest()
+
+# Wysłanie zdjęcia do API; zwraca nazwę najlepiej pasującej etykiety albo None
+@metrics.timed("image_api.fetch_label")
+def fetch_label(image_bytes, api_key, api_url=IMAGE_API_URL, upload_mode=UPLOAD_MODE):
+    headers = {"Authorization": f"Bearer {api_key}"}
+    if upload_mode == "multipart":
+        response = http_client.post(
+            api_url, headers=headers, files={"image": ("posilek.jpg", image_bytes, "image/jpeg")}, timeout=30
+        )
+    else:
+        payload = {"image": base64.b64encode(image_bytes).decode("utf-8")}
+        response = http_client.post(api_url, headers=headers, json=payload, timeout=30)
+    response.raise_for_status()
+
+    result = response.json()
+    if result and "labels" in result and result["labels"]:
+        return result["labels"][0]["name"]
+    return None
+
+# Rozpoznanie produktu na zdjęciu; każde zdjęcie jest analizowane tylko raz
+def analyze_image(image_bytes, api_key, api_url=IMAGE_API_URL, upload_mode=UPLOAD_MODE,
+                  max_edge=MAX_EDGE, quality=QUALITY, cache=None):
+    cache = cache or api_cache.get_cache()
+
+    def fetch():
+        try:
+            prepared = preprocess_image(image_bytes, max_edge, quality)
+        except OSError:
+            # Format nieobsługiwany przez Pillow - wysyłamy oryginał
+            prepared = image_bytes
+        return fetch_label(prepared, api_key, api_url, upload_mode)
+
+    return cache.get_or_fetch("image", image_hash(image_bytes), fetch)
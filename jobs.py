@@ -0,0 +1,163 @@
+import json
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import db
+import metrics
+import write_queue
+
+# Zadania w tle (rozpoznawanie zdjęć, wyszukiwanie produktów). Strona zleca zadanie, zapamiętuje
+# jego id w session_state i odpytuje o wynik, zamiast czekać na API w wątku skryptu.
+# Wyniki są zapisywane w bazie, więc kolejne odświeżenia i sesje dostają je bez ponownego wywołania.
+JOBS_PATH = "data/zadania.db"
+# Liczba wątków roboczych (zadania czekają głównie na sieć, więc wątki wystarczą)
+WORKERS = int(os.environ.get("JOB_WORKERS", 4))
+# Jak długo gotowy wynik jest używany ponownie dla tego samego klucza
+RESULT_TTL = 24 * 3600
+# Starsze zadania są usuwane przy starcie kolejki
+KEEP_FOR = 7 * 24 * 3600
+
+PENDING = "oczekuje"
+RUNNING = "w_toku"
+DONE = "gotowe"
+FAILED = "blad"
+FINISHED = {DONE, FAILED}
+
+def _init_schema(conn):
+    with conn:
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS zadania (
+                id TEXT PRIMARY KEY,
+                rodzaj TEXT NOT NULL,
+                klucz TEXT NOT NULL,
+                status TEXT NOT NULL,
+                wynik TEXT,
+                blad TEXT,
+                utworzono REAL NOT NULL,
+                zakonczono REAL
+            )
+        ''')
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_zadania_klucz ON zadania (rodzaj, klucz, utworzono)")
+
+class JobQueue:
+    def __init__(self, db_path=JOBS_PATH, workers=WORKERS):
+        self.db_path = db_path
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="zadanie")
+        # Zadania zlecone w tym procesie: (rodzaj, klucz) -> id, żeby nie dublować trwających
+        self._active = {}
+        self._lock = threading.Lock()
+        self._stats = {"submitted": 0, "reused": 0, "done": 0, "failed": 0}
+        # Zadania niedokończone przez poprzedni proces nie mają już danych wejściowych
+        now = time.time()
+        self._write(lambda conn: (
+            conn.execute(
+                "UPDATE zadania SET status = ?, blad = ?, zakonczono = ? WHERE status IN (?, ?)",
+                (FAILED, "Zadanie przerwane (restart aplikacji)", now, PENDING, RUNNING)
+            ),
+            conn.execute("DELETE FROM zadania WHERE utworzono < ?", (now - KEEP_FOR,))
+        ))
+
+    def _conn(self):
+        return db.get_connection(self.db_path, _init_schema)
+
+    def _write(self, job):
+        return write_queue.write(self.db_path, job, _init_schema)
+
+    def _count(self, name):
+        with self._lock:
+            self._stats[name] += 1
+
+    # Zlecenie zadania: fn() wykonywane w tle, wynik (zapisywalny jako JSON) trafia do bazy.
+    # Zadanie o tym samym rodzaju i kluczu, trwające lub zakończone sukcesem w ciągu RESULT_TTL,
+    # nie jest zlecane ponownie - zwracane jest jego id.
+    def submit(self, kind, key, fn):
+        with self._lock:
+            active = self._active.get((kind, key))
+        if active is not None:
+            self._count("reused")
+            return active
+        row = self._conn().execute(
+            "SELECT id FROM zadania WHERE rodzaj = ? AND klucz = ? AND status = ? AND zakonczono >= ? "
+            "ORDER BY utworzono DESC LIMIT 1",
+            (kind, key, DONE, time.time() - RESULT_TTL)
+        ).fetchone()
+        if row is not None:
+            self._count("reused")
+            return row[0]
+
+        with self._lock:
+            # Drugie sprawdzenie pod blokadą - dwie sesje mogły zlecić to samo naraz
+            active = self._active.get((kind, key))
+            if active is not None:
+                self._stats["reused"] += 1
+                return active
+            job_id = uuid.uuid4().hex
+            self._active[(kind, key)] = job_id
+            self._stats["submitted"] += 1
+        self._write(lambda conn: conn.execute(
+            "INSERT INTO zadania (id, rodzaj, klucz, status, utworzono) VALUES (?, ?, ?, ?, ?)",
+            (job_id, kind, key, PENDING, time.time())
+        ))
+        self._executor.submit(self._run, job_id, kind, key, fn)
+        return job_id
+
+    def _run(self, job_id, kind, key, fn):
+        self._write(lambda conn: conn.execute("UPDATE zadania SET status = ? WHERE id = ?", (RUNNING, job_id)))
+        try:
+            with metrics.span(f"jobs.{kind}"):
+                result = fn()
+            status, value, error = DONE, json.dumps(result, ensure_ascii=False), None
+        except Exception as e:
+            status, value, error = FAILED, None, f"{type(e).__name__}: {e}"
+        self._write(lambda conn: conn.execute(
+            "UPDATE zadania SET status = ?, wynik = ?, blad = ?, zakonczono = ? WHERE id = ?",
+            (status, value, error, time.time(), job_id)
+        ))
+        with self._lock:
+            self._active.pop((kind, key), None)
+        self._count("done" if status == DONE else "failed")
+
+    # Stan zadania: {"id", "status", "wynik", "blad"}; None dla nieznanego id
+    def get(self, job_id):
+        row = self._conn().execute(
+            "SELECT id, status, wynik, blad FROM zadania WHERE id = ?", (job_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        return {"id": row[0], "status": row[1], "wynik": json.loads(row[2]) if row[2] else None, "blad": row[3]}
+
+    # Czekanie na zakończenie zadania (np. w skryptach i pomiarach); zwraca stan zadania
+    def wait(self, job_id, timeout=None, interval=0.05):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            job = self.get(job_id)
+            if job is None or job["status"] in FINISHED:
+                return job
+            if deadline is not None and time.monotonic() > deadline:
+                return job
+            time.sleep(interval)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats["active"] = len(self._active)
+        return stats
+
+_default = None
+_default_lock = threading.Lock()
+
+def get_queue():
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = JobQueue()
+        return _default
+
+# Statystyki domyślnej kolejki (puste, jeśli nie była jeszcze używana)
+def stats():
+    with _default_lock:
+        queue = _default
+    return queue.stats() if queue is not None else {}
@@ -0,0 +1,43 @@
+import streamlit as st
+
+import analytics
+import meal_store
+import metrics
+
+# Odczyty dziennika współdzielone przez sesje Streamlit. Kluczem jest użytkownik, dzień
+# i numer wersji danych (meal_store.data_version), który zmieniają tylko zapisy - interakcje
+# z widżetami nie czytają więc z dysku. Limit wpisów trzyma pamięć w ryzach przy wielu sesjach,
+# a TTL odświeża dane zmienione poza procesem (np. importem z wiersza poleceń).
+CACHE_ENTRIES = 2000
+CACHE_TTL = 600
+
+@st.cache_data(max_entries=CACHE_ENTRIES, ttl=CACHE_TTL, show_spinner=False)
+def _load_day(username, day, version):
+    metrics.inc("meal_cache.misses")
+    return meal_store.load_day(username, day)
+
+@st.cache_data(max_entries=CACHE_ENTRIES, ttl=CACHE_TTL, show_spinner=False)
+def _get_rollup(username, okres, klucz, version):
+    metrics.inc("meal_cache.misses")
+    return meal_store.get_rollup(username, okres, klucz)
+
+@st.cache_data(max_entries=CACHE_ENTRIES, ttl=CACHE_TTL, show_spinner=False)
+def _daily_totals(username, end, version):
+    metrics.inc("meal_cache.misses")
+    return analytics.daily_totals(username, end=end)
+
+def load_day(username, day):
+    metrics.inc("meal_cache.lookups")
+    return _load_day(username, day, meal_store.data_version(username))
+
+def get_rollup(username, okres, klucz):
+    metrics.inc("meal_cache.lookups")
+    return _get_rollup(username, okres, klucz, meal_store.data_version(username))
+
+# Dzienne sumy całej historii do statystyk i wykresów
+def daily_totals(username, end):
+    metrics.inc("meal_cache.lookups")
+    return _daily_totals(username, end, meal_store.data_version(username))
+
+def hit_rate():
+    return metrics.hit_rate("meal_cache.lookups", "meal_cache.misses")
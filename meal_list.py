@@ -0,0 +1,47 @@
+import pandas as pd
+import streamlit as st
+
+import metrics
+
+# Liczba wierszy na stronie listy posiłków
+PAGE_SIZE = 50
+
+# Kolumny do wyświetlenia: nazwa w tabeli -> kolumna dziennika
+DISPLAY_COLUMNS = {
+    "Godzina": "czas",
+    "Produkt": "produkt",
+    "Waga (g)": "waga",
+    "Kalorie": "kalorie",
+    "Białko (g)": "białko",
+    "Tłuszcz (g)": "tłuszcz",
+    "Węglowodany (g)": "węglowodany",
+    "Typ": "typ",
+}
+
+# Przygotowanie tabeli do wyświetlenia jedną operacją na kolumnach (bez pętli po wierszach)
+def format_meals(df, with_date=False):
+    out = pd.DataFrame(index=df.index)
+    if with_date:
+        out["Data"] = df["data"].astype(str)
+    for label, col in DISPLAY_COLUMNS.items():
+        out[label] = df[col]
+    for label in ["Waga (g)", "Kalorie"]:
+        out[label] = pd.to_numeric(out[label], errors="coerce").round().astype("Int64")
+    for label in ["Białko (g)", "Tłuszcz (g)", "Węglowodany (g)"]:
+        out[label] = pd.to_numeric(out[label], errors="coerce").round(1)
+    return out.reset_index(drop=True)
+
+# Lista posiłków jako jeden element tabeli; długie listy są dzielone na strony
+@metrics.timed("meal_list.render")
+def render_meal_list(df, key="posilki", page_size=PAGE_SIZE, with_date=False):
+    pages = max(1, -(-len(df) // page_size))
+    page = 1
+    if pages > 1:
+        page = st.number_input(
+            f"Strona (z {pages})", min_value=1, max_value=pages, value=1, step=1, key=f"{key}_strona"
+        )
+    start = (page - 1) * page_size
+    table = format_meals(df.iloc[start:start + page_size], with_date)
+    st.dataframe(table, hide_index=True)
+    if pages > 1:
+        st.caption(f"Wiersze {start + 1}–{min(start + page_size, len(df))} z {len(df)}")
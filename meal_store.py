@@ -0,0 +1,306 @@
+import json
+import os
+import threading
+from datetime import datetime
+
+import pandas as pd
+
+import db
+import rollups
+import write_queue
+
+# Baza z dziennikiem posiłków wszystkich użytkowników
+DB_PATH = "data/posilki.db"
+DATA_DIR = "data"
+
+# Kolumny w kolejności znanej ze starych plików CSV
+COLUMNS = ["data", "czas", "produkt", "waga", "kalorie", "typ", "białko", "tłuszcz", "węglowodany"]
+
+# Numer wersji danych użytkownika w tym procesie, zwiększany po każdym zapisie.
+# Klucz pamięci podręcznej odczytów - zmienia się tylko wtedy, gdy dane się zmieniły.
+_versions = {}
+_versions_lock = threading.Lock()
+# Użytkownicy, dla których sprawdzono już import starego CSV
+_ready = set()
+
+def data_version(username, db_path=DB_PATH):
+    return _versions.get((db_path, username), 0)
+
+def _bump(username, db_path):
+    with _versions_lock:
+        key = (db_path, username)
+        _versions[key] = _versions.get(key, 0) + 1
+
+def get_connection(db_path=DB_PATH):
+    return db.get_connection(db_path, _init_schema)
+
+def close_connections():
+    db.close_connections()
+
+def _init_schema(conn):
+    with conn:
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS posilki (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                username TEXT NOT NULL,
+                data TEXT NOT NULL,
+                czas TEXT,
+                produkt TEXT,
+                waga REAL,
+                kalorie REAL,
+                typ TEXT,
+                białko REAL,
+                tłuszcz REAL,
+                węglowodany REAL
+            )
+        ''')
+        # Indeks pod zapytania o dzień i zakres dat danego użytkownika oraz wykrywanie duplikatów
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_posilki_user_data_czas ON posilki (username, data, czas, produkt)"
+        )
+        conn.execute("DROP INDEX IF EXISTS idx_posilki_user_data")
+        # Rejestr jednorazowych importów ze starych plików CSV
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS importy (
+                username TEXT PRIMARY KEY,
+                zrodlo TEXT,
+                wierszy INTEGER,
+                zaimportowano TEXT
+            )
+        ''')
+    rollups.init_rollup_schema(conn)
+
+def _row_values(username, row):
+    return (username,) + tuple(row.get(col) for col in COLUMNS)
+
+_INSERT_SQL = (
+    "INSERT INTO posilki (username, " + ", ".join(COLUMNS) + ") "
+    "VALUES (?, " + ", ".join("?" for _ in COLUMNS) + ")"
+)
+
+# (username, data, typ, kalorie, białko, tłuszcz, węglowodany) dla podsumowań
+def _rollup_row(values):
+    return (values[0], values[1], values[6], values[5], values[7], values[8], values[9])
+
+# Wstawienie wierszy razem z aktualizacją podsumowań; wywoływane w transakcji zapisu
+def _insert(conn, values):
+    conn.executemany(_INSERT_SQL, values)
+    rollups.update_rollups(conn, [_rollup_row(v) for v in values])
+
+# Wszystkie zapisy idą przez jeden wątek zapisujący na bazę (write_queue),
+# który łączy równoczesne zapisy wielu sesji w jedną transakcję
+def _write(db_path, job):
+    return write_queue.write(db_path, job, _init_schema)
+
+# Dowolny zapis job(conn) w transakcji wątku zapisującego (np. masowe korekty)
+def write(job, db_path=DB_PATH):
+    return _write(db_path, job)
+
+# Unieważnienie odczytów z pamięci podręcznej po zmianie danych podanych użytkowników
+def mark_changed(usernames, db_path=DB_PATH):
+    for username in usernames:
+        _bump(username, db_path)
+
+# Dopisanie jednego posiłku - koszt niezależny od długości historii
+def add_meal(username, row, db_path=DB_PATH):
+    values = _row_values(username, row)
+
+    def job(conn):
+        cur = conn.execute(_INSERT_SQL, values)
+        rollups.update_rollups(conn, [_rollup_row(values)])
+        return cur.lastrowid
+
+    meal_id = _write(db_path, job)
+    _bump(username, db_path)
+    return meal_id
+
+# Dopisanie wielu posiłków w jednej transakcji
+def add_meals(username, rows, db_path=DB_PATH):
+    values = [_row_values(username, row) for row in rows]
+    _write(db_path, lambda conn: _insert(conn, values))
+    _bump(username, db_path)
+
+# Klucz rozpoznawania duplikatów: dzień, godzina, produkt i kalorie
+def _dedup_key(values):
+    kalorie = values[5]
+    try:
+        kalorie = round(float(kalorie), 2)
+    except (TypeError, ValueError):
+        pass
+    return (values[1], values[2], values[3], kalorie)
+
+# Liczba wpisów sprzed importu (id <= last_id) dla każdego klucza duplikatu z podanych dni;
+# jedno zapytanie na partię dni zamiast jednego na wiersz
+def _stored_counts(conn, username, days, last_id):
+    counts = {}
+    days = sorted(days)
+    for i in range(0, len(days), 500):
+        part = days[i:i + 500]
+        cur = conn.execute(
+            "SELECT username, data, czas, produkt, waga, kalorie FROM posilki "
+            "WHERE username = ? AND data IN (" + ", ".join("?" for _ in part) + ") AND id <= ?",
+            (username, *part, last_id)
+        )
+        for row in cur:
+            key = _dedup_key(row)
+            counts[key] = counts.get(key, 0) + 1
+    return counts
+
+# Odrzucenie wierszy, które już były w dzienniku przed importem (id <= last_id). Powtórzenia
+# w samym pliku (np. dwie kawy bez godziny) zostają; każdy zapisany wpis pokrywa jeden wiersz
+# pliku, więc ponowny import tego samego pliku niczego nie dodaje. Liczba pokrytych wierszy
+# jest trzymana w tabeli tymczasowej i tylko dla kluczy mających wpisy w dzienniku, więc pamięć
+# nie rośnie z długością pliku.
+def _new_only(conn, username, values, last_id):
+    stored = _stored_counts(conn, username, {v[1] for v in values}, last_id)
+    keys = {key: json.dumps(key, ensure_ascii=False) for key in {_dedup_key(v) for v in values} if key in stored}
+    texts = list(keys.values())
+    used = {}
+    for i in range(0, len(texts), 500):
+        part = texts[i:i + 500]
+        used.update(conn.execute(
+            "SELECT klucz, pokryte FROM temp.import_pokryte WHERE klucz IN (" + ", ".join("?" for _ in part) + ")",
+            part
+        ))
+    fresh = []
+    for v in values:
+        key = _dedup_key(v)
+        if key in keys and used.get(keys[key], 0) < stored[key]:
+            used[keys[key]] = used.get(keys[key], 0) + 1
+            continue
+        fresh.append(v)
+    conn.executemany("INSERT OR REPLACE INTO temp.import_pokryte (klucz, pokryte) VALUES (?, ?)", used.items())
+    return fresh
+
+# Wstawienie strumienia partii wierszy w jednej transakcji, z pominięciem duplikatów.
+# Partie są czytane dopiero w wątku zapisującym, więc w pamięci jest naraz tylko jedna.
+# Zwraca (dodane, pominięte).
+def add_meal_chunks(username, chunks, db_path=DB_PATH):
+    def job(conn):
+        added = skipped = 0
+        last_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM posilki").fetchone()[0]
+        conn.execute("CREATE TEMP TABLE IF NOT EXISTS import_pokryte (klucz TEXT PRIMARY KEY, pokryte INTEGER NOT NULL)")
+        conn.execute("DELETE FROM temp.import_pokryte")
+        for rows in chunks:
+            values = [_row_values(username, row) for row in rows]
+            fresh = _new_only(conn, username, values, last_id)
+            _insert(conn, fresh)
+            added += len(fresh)
+            skipped += len(values) - len(fresh)
+        conn.execute("DROP TABLE temp.import_pokryte")
+        return added, skipped
+
+    result = _write(db_path, job)
+    _bump(username, db_path)
+    return result
+
+# Strumieniowy odczyt dziennika partiami (np. do eksportu); zwraca krotki w kolejności COLUMNS
+def iter_meals(username, start=None, end=None, batch_size=10_000, db_path=DB_PATH):
+    conn = get_connection(db_path)
+    cur = conn.execute(
+        "SELECT " + ", ".join(COLUMNS) + " FROM posilki "
+        "WHERE username = ? AND data BETWEEN ? AND ? ORDER BY data, id",
+        (username, start or "0000-00-00", end or "9999-99-99")
+    )
+    while True:
+        rows = cur.fetchmany(batch_size)
+        if not rows:
+            return
+        yield from rows
+
+def load_meals(username, db_path=DB_PATH):
+    conn = get_connection(db_path)
+    cur = conn.execute(
+        "SELECT " + ", ".join(COLUMNS) + " FROM posilki WHERE username = ? ORDER BY id",
+        (username,)
+    )
+    return pd.DataFrame(cur.fetchall(), columns=COLUMNS)
+
+# Posiłki z jednego dnia - koszt zależy tylko od liczby wpisów tego dnia
+def load_day(username, day, db_path=DB_PATH):
+    return load_range(username, day, day, db_path)
+
+# Posiłki z zakresu dat (włącznie), daty w formacie RRRR-MM-DD
+def load_range(username, start, end, db_path=DB_PATH):
+    conn = get_connection(db_path)
+    cur = conn.execute(
+        "SELECT " + ", ".join(COLUMNS) + " FROM posilki "
+        "WHERE username = ? AND data BETWEEN ? AND ? ORDER BY data, id",
+        (username, start, end)
+    )
+    return pd.DataFrame(cur.fetchall(), columns=COLUMNS)
+
+# Suma kalorii i makroskładników z jednego dnia
+def day_totals(username, day, db_path=DB_PATH):
+    conn = get_connection(db_path)
+    row = conn.execute(
+        "SELECT COUNT(*), TOTAL(kalorie), TOTAL(białko), TOTAL(tłuszcz), TOTAL(węglowodany) "
+        "FROM posilki WHERE username = ? AND data = ?",
+        (username, day)
+    ).fetchone()
+    return {"posilki": row[0], "kalorie": row[1], "białko": row[2], "tłuszcz": row[3], "węglowodany": row[4]}
+
+# Podsumowanie jednego okresu, np. ("dzien", "2024-06-15") lub ("tydzien", "2024-W24")
+def get_rollup(username, okres, klucz, typ=rollups.ALL_TYPES, db_path=DB_PATH):
+    conn = get_connection(db_path)
+    row = conn.execute(
+        "SELECT posilki, " + ", ".join(rollups.FIELDS) + " FROM podsumowania "
+        "WHERE username = ? AND okres = ? AND klucz = ? AND typ = ?",
+        (username, okres, klucz, typ)
+    ).fetchone()
+    row = row or (0,) + (0.0,) * len(rollups.FIELDS)
+    return dict(zip(["posilki"] + rollups.FIELDS, row))
+
+# Podsumowania okresów z zakresu kluczy (np. do wykresów trendów)
+def get_rollups(username, okres, start, end, typ=rollups.ALL_TYPES, db_path=DB_PATH):
+    conn = get_connection(db_path)
+    cur = conn.execute(
+        "SELECT klucz, posilki, " + ", ".join(rollups.FIELDS) + " FROM podsumowania "
+        "WHERE username = ? AND okres = ? AND typ = ? AND klucz BETWEEN ? AND ? ORDER BY klucz",
+        (username, okres, typ, start, end)
+    )
+    return pd.DataFrame(cur.fetchall(), columns=["klucz", "posilki"] + rollups.FIELDS)
+
+# Ścieżka do starego pliku CSV danego użytkownika
+def legacy_csv_path(username):
+    return os.path.join(DATA_DIR, f"posilki_{username}.csv")
+
+def _imported(conn, username):
+    return conn.execute("SELECT 1 FROM importy WHERE username = ?", (username,)).fetchone() is not None
+
+# Jednorazowy import starego pliku CSV; kolejne wywołania nic nie robią
+def import_csv(username, csv_path, db_path=DB_PATH):
+    if _imported(get_connection(db_path), username):
+        return 0
+    rows = []
+    if os.path.exists(csv_path):
+        df = pd.read_csv(csv_path)
+        for col in COLUMNS:
+            if col not in df.columns:
+                df[col] = None
+        df = df[COLUMNS].astype(object).where(df[COLUMNS].notna(), None)
+        rows = [_row_values(username, r) for r in df.to_dict("records")]
+
+    # Import i wpis w rejestrze w jednej transakcji - przerwany import nie zostawia połowy danych,
+    # a ponowne sprawdzenie rejestru chroni przed podwójnym importem z dwóch sesji naraz
+    def job(conn):
+        if _imported(conn, username):
+            return 0
+        _insert(conn, rows)
+        conn.execute(
+            "INSERT INTO importy (username, zrodlo, wierszy, zaimportowano) VALUES (?, ?, ?, ?)",
+            (username, csv_path, len(rows), datetime.now().isoformat())
+        )
+        return len(rows)
+
+    imported = _write(db_path, job)
+    _bump(username, db_path)
+    return imported
+
+# Przygotowanie dziennika użytkownika (z importem starego CSV przy pierwszym użyciu)
+def ensure_user_log(username, db_path=DB_PATH):
+    if (db_path, username) in _ready:
+        return 0
+    imported = import_csv(username, legacy_csv_path(username), db_path)
+    _ready.add((db_path, username))
+    return imported
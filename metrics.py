@@ -0,0 +1,219 @@
+import cProfile
+import functools
+import json
+import os
+import pstats
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Eksport (opcjonalny): plik w formacie Prometheusa, dopisywany plik JSONL i/lub lokalny endpoint HTTP
+METRICS_FILE = os.environ.get("METRICS_FILE")
+METRICS_JSONL = os.environ.get("METRICS_JSONL")
+METRICS_PORT = os.environ.get("METRICS_PORT")
+EXPORT_INTERVAL = float(os.environ.get("METRICS_INTERVAL", "15"))
+# Katalog na profile pojedynczych odświeżeń strony
+PROFILE_DIR = "data/profile"
+
+# Liczniki procesu (trafienia pamięci podręcznej, ponowienia itp.)
+_counters = {}
+# Czasy wykonania: nazwa -> [liczba wywołań, suma sekund, najdłuższe wywołanie]
+_spans = {}
+_lock = threading.Lock()
+
+def inc(name, n=1):
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + n
+
+def get(name):
+    with _lock:
+        return _counters.get(name, 0)
+
+def snapshot():
+    with _lock:
+        return dict(_counters)
+
+# Udział trafień: (wywołania - chybienia) / wywołania
+def hit_rate(lookups, misses):
+    total = get(lookups)
+    return (total - get(misses)) / total if total else 0.0
+
+def observe(name, seconds):
+    with _lock:
+        span = _spans.setdefault(name, [0, 0.0, 0.0])
+        span[0] += 1
+        span[1] += seconds
+        span[2] = max(span[2], seconds)
+
+# Pomiar czasu bloku kodu; czas jest zapisywany także wtedy, gdy blok rzuci wyjątek
+@contextmanager
+def span(name):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, time.perf_counter() - start)
+
+# Dekorator mierzący czas funkcji
+def timed(name):
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def spans():
+    with _lock:
+        return {name: {"count": c, "sum": s, "max": m} for name, (c, s, m) in _spans.items()}
+
+def reset():
+    with _lock:
+        _counters.clear()
+        _spans.clear()
+
+# Wszystkie metryki procesu: liczniki, czasy oraz statystyki pamięci podręcznych,
+# klienta HTTP, kolejki zadań w tle i wątków zapisujących (tylko tych, które już zostały utworzone)
+def collect():
+    import api_cache
+    import http_client
+    import jobs
+    import write_queue
+
+    return {
+        "czas": datetime.now().isoformat(timespec="seconds"),
+        "liczniki": snapshot(),
+        "czasy": spans(),
+        "meal_cache": {"hit_rate": hit_rate("meal_cache.lookups", "meal_cache.misses")},
+        "api_cache": api_cache.stats(),
+        "http": http_client.stats(),
+        "jobs": jobs.stats(),
+        "write_queue": write_queue.stats(),
+    }
+
+def _metric_name(name):
+    return "kalorie_" + "".join(c if c.isalnum() and c.isascii() else "_" for c in name)
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"')
+
+# Metryki w formacie tekstowym Prometheusa
+def prometheus_text(data=None):
+    data = data or collect()
+    lines = []
+    for name, value in sorted(data["liczniki"].items()):
+        metric = _metric_name(name) + "_total"
+        lines += [f"# TYPE {metric} counter", f"{metric} {value}"]
+    if data["czasy"]:
+        lines.append("# TYPE kalorie_span_seconds summary")
+        for name, s in sorted(data["czasy"].items()):
+            lines.append(f'kalorie_span_seconds_count{{span="{_label(name)}"}} {s["count"]}')
+            lines.append(f'kalorie_span_seconds_sum{{span="{_label(name)}"}} {s["sum"]:.6f}')
+        lines.append("# TYPE kalorie_span_seconds_max gauge")
+        for name, s in sorted(data["czasy"].items()):
+            lines.append(f'kalorie_span_seconds_max{{span="{_label(name)}"}} {s["max"]:.6f}')
+    for component in ["meal_cache", "api_cache", "http", "jobs"]:
+        for key, value in sorted(data[component].items()):
+            metric = _metric_name(f"{component}_{key}")
+            lines += [f"# TYPE {metric} gauge", f"{metric} {value}"]
+    keys = sorted({key for stats in data["write_queue"].values() for key in stats})
+    for key in keys:
+        metric = _metric_name("write_queue_" + key)
+        lines.append(f"# TYPE {metric} gauge")
+        for db_path, stats in sorted(data["write_queue"].items()):
+            lines.append(f'{metric}{{db="{_label(db_path)}"}} {stats[key]}')
+    return "\n".join(lines) + "\n"
+
+def write_prometheus(path, data=None):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        f.write(prometheus_text(data))
+    os.replace(path + ".tmp", path)
+
+def append_jsonl(path, data=None):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(data or collect(), ensure_ascii=False) + "\n")
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.rstrip("/") == "/metrics.json":
+            body = json.dumps(collect(), ensure_ascii=False).encode("utf-8")
+            content_type = "application/json"
+        elif self.path.rstrip("/") in ("", "/metrics"):
+            body = prometheus_text().encode("utf-8")
+            content_type = "text/plain; version=0.0.4"
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+# Lokalny endpoint /metrics (Prometheus) i /metrics.json; tylko na 127.0.0.1
+def start_http_server(port, host="127.0.0.1"):
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    threading.Thread(target=server.serve_forever, daemon=True, name="metrics-http").start()
+    return server
+
+_exporter_started = False
+_exporter_lock = threading.Lock()
+
+def _export_loop(interval, prometheus_path, jsonl_path):
+    while True:
+        time.sleep(interval)
+        data = collect()
+        if prometheus_path:
+            write_prometheus(prometheus_path, data)
+        if jsonl_path:
+            append_jsonl(jsonl_path, data)
+
+# Uruchomienie eksportu skonfigurowanego zmiennymi METRICS_*; raz na proces, kolejne wywołania nic nie robią
+def start_exporters(prometheus_path=METRICS_FILE, jsonl_path=METRICS_JSONL, port=METRICS_PORT,
+                    interval=EXPORT_INTERVAL):
+    global _exporter_started
+    with _exporter_lock:
+        if _exporter_started:
+            return
+        _exporter_started = True
+    if port:
+        start_http_server(int(port))
+    if prometheus_path or jsonl_path:
+        threading.Thread(
+            target=_export_loop, args=(interval, prometheus_path, jsonl_path), daemon=True, name="metrics-export"
+        ).start()
+
+# Profilowanie pojedynczego odświeżenia strony (cProfile). start_profile zwraca profiler
+# albo None, gdy profilowanie jest wyłączone lub trwa już inne (naraz działa tylko jedno);
+# finish_profile zapisuje plik .prof i zestawienie 30 najdroższych funkcji w pliku .txt.
+# Zwraca ścieżkę do pliku .prof.
+_profile_lock = threading.Lock()
+
+def start_profile(enabled):
+    if not enabled or not _profile_lock.acquire(blocking=False):
+        return None
+    profiler = cProfile.Profile()
+    profiler.enable()
+    return profiler
+
+def finish_profile(profiler, name, profile_dir=PROFILE_DIR):
+    if profiler is None:
+        return None
+    try:
+        profiler.disable()
+        os.makedirs(profile_dir, exist_ok=True)
+        path = os.path.join(profile_dir, f"{name}-{datetime.now():%Y%m%d-%H%M%S-%f}.prof")
+        profiler.dump_stats(path)
+        with open(path[:-5] + ".txt", "w", encoding="utf-8") as f:
+            pstats.Stats(profiler, stream=f).sort_stats("cumulative").print_stats(30)
+    finally:
+        _profile_lock.release()
+    return path
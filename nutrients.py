@@ -0,0 +1,87 @@
+import numpy as np
+import pandas as pd
+
+import meal_store
+import rollups
+
+# Wartości odżywcze przeliczane według wagi porcji
+FIELDS = ["kalorie", "białko", "tłuszcz", "węglowodany"]
+
+def _number(value):
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    return None if value != value else value
+
+# Sprowadzenie produktu z wartościami na porcję do wartości na 100 g.
+# Bez znanej wagi porcji wartości zostają na porcję (na_100g = False).
+def normalize_product(product, serving_grams=None):
+    grams = _number(serving_grams if serving_grams is not None else product.get("porcja_g"))
+    out = dict(product)
+    if product.get("na_100g"):
+        return out
+    if grams and grams > 0:
+        for f in FIELDS:
+            value = _number(product.get(f))
+            out[f] = None if value is None else value * 100.0 / grams
+        out["porcja_g"] = grams
+        out["na_100g"] = True
+    else:
+        out["na_100g"] = False
+    return out
+
+# Wartości posiłku dla podanej wagi (g); produkt bez wartości na 100 g liczony jest jako jedna porcja
+def scale(product, waga):
+    factor = (waga or 0) / 100.0 if product.get("na_100g") else 1.0
+    return {f: round((_number(product.get(f)) or 0.0) * factor, 1) for f in FIELDS}
+
+# Wersja wektorowa: ramka wartości na 100 g (kolumny FIELDS) i wagi -> ramka wartości posiłków
+def meal_values(per_100g, waga):
+    factors = np.asarray(waga, dtype=np.float64) / 100.0
+    values = per_100g[FIELDS].to_numpy(dtype=np.float64) * factors[:, None]
+    return pd.DataFrame(values, columns=FIELDS, index=per_100g.index)
+
+# Przeliczenie zapisanej historii po korekcie danych produktów.
+# corrections: {nazwa produktu: {kalorie, białko, tłuszcz, węglowodany na 100 g}}.
+# Wpisy tych produktów dostają wartości z wagi posiłku, a podsumowania - różnice. Wpisy bez
+# znanej wagi w gramach (np. "1 medium" z Cronometer) zostają bez zmian.
+# Zwraca (zmienione wpisy, pominięte wpisy bez wagi).
+def recalculate_history(corrections, username=None, db_path=meal_store.DB_PATH):
+    table = pd.DataFrame.from_dict(corrections, orient="index", columns=FIELDS).astype(np.float64)
+    names = list(table.index)
+
+    # Limit parametrów zapytania SQLite - nazwy produktów wybieramy partiami
+    def select(conn, chunk):
+        where = "produkt IN (" + ", ".join("?" for _ in chunk) + ")"
+        params = list(chunk)
+        if username is not None:
+            where += " AND username = ?"
+            params.append(username)
+        return conn.execute(
+            "SELECT id, username, data, typ, produkt, waga, " + ", ".join(FIELDS) + " FROM posilki WHERE " + where,
+            params
+        ).fetchall()
+
+    def job(conn):
+        rows = [r for i in range(0, len(names), 500) for r in select(conn, names[i:i + 500])]
+        old = pd.DataFrame(rows, columns=["id", "username", "data", "typ", "produkt", "waga"] + FIELDS)
+        waga = pd.to_numeric(old["waga"], errors="coerce").fillna(0.0)
+        skipped = int((waga <= 0).sum())
+        old, waga = old[waga > 0].copy(), waga[waga > 0]
+        if old.empty:
+            return 0, skipped, []
+        old[FIELDS] = old[FIELDS].apply(pd.to_numeric, errors="coerce").fillna(0.0)
+        new = meal_values(table.loc[old["produkt"]].set_axis(old.index), waga).round(2)
+
+        conn.executemany(
+            "UPDATE posilki SET " + ", ".join(f"{f} = ?" for f in FIELDS) + " WHERE id = ?",
+            zip(*(new[f].tolist() for f in FIELDS), old["id"].tolist())
+        )
+        deltas = old[["username", "data", "typ"]].assign(posilki=0, **{f: new[f] - old[f] for f in FIELDS})
+        rollups.apply_frame_deltas(conn, deltas)
+        return len(old), skipped, old["username"].unique().tolist()
+
+    changed, skipped, users = meal_store.write(job, db_path)
+    meal_store.mark_changed(users, db_path)
+    return changed, skipped
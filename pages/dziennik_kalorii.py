@@ -1,282 +1,265 @@
 import streamlit as st
-import pandas as pd
 from datetime import datetime, date
-import os
-import requests
-import base64
+
+import analytics
+import api_cache
+import food_api
+import image_api
+import jobs
+import meal_cache
+import meal_list
+import meal_store
+import metrics
+import nutrients
+import user_store
 
 # Sprawdzenie, czy użytkownik jest zalogowany
 if "logged_in" not in st.session_state or not st.session_state.logged_in:
     st.warning("Proszę zalogować się, aby uzyskać dostęp do aplikacji.")
     st.stop()
 
-# Ścieżka do pliku z danymi (dla danego użytkownika)
-DATA_PATH = f"data/posilki_{st.session_state.username}.csv"
+# Eksport metryk (zmienne METRICS_*) i profilowanie jednego odświeżenia (?profil=1)
+metrics.start_exporters()
+# Parametr jest usuwany od razu, żeby kolejne odświeżenia (także po st.rerun) nie były profilowane;
+# profil jest zapisywany także wtedy, gdy przebieg przerwie st.rerun lub st.stop
+profil = st.query_params.get("profil") == "1"
+if profil:
+    del st.query_params["profil"]
+profiler = metrics.start_profile(profil)
 
-# Inicjalizacja danych
-def load_data():
-    if not os.path.exists("data"):
-        os.makedirs("data")
-    if not os.path.exists(DATA_PATH):
-        df = pd.DataFrame(columns=["data", "czas", "produkt", "waga", "kalorie", "typ", "białko", "tłuszcz", "węglowodany"])
-        df.to_csv(DATA_PATH, index=False)
-    return pd.read_csv(DATA_PATH)
+try:
+    # Wczytanie posiłków z jednego dnia (bez ładowania całej historii, z pamięci podręcznej)
+    @metrics.timed("dziennik.load_data")
+    def load_data(day):
+        meal_store.ensure_user_log(st.session_state.username)
+        return meal_cache.load_day(st.session_state.username, day)
 
-def save_data(df):
-    df.to_csv(DATA_PATH, index=False)
+    # Dopisanie jednego posiłku bez przepisywania całej historii
+    @metrics.timed("dziennik.save_data")
+    def save_data(new_row):
+        meal_store.add_meal(st.session_state.username, new_row)
 
-# Funkcja do wysyłania zdjęcia do API
-def analyze_image_with_api(image_bytes):
-    # Klucz API z Streamlit Secrets
-    API_KEY = st.secrets["api_keys"]["image_recognition_key"]
-    # Poniższy kod jest tylko szkieletem.
-    API_URL = "https://example.com/api/v1/analyze"
-    
-    try:
-        encoded_string = base64.b64encode(image_bytes).decode('utf-8')
-        headers = {"Content-Type": "application/json", "Authorization": f"Bearer {API_KEY}"}
-        payload = {"image": encoded_string}
-        
-        response = requests.post(API_URL, headers=headers, json=payload, timeout=30)
-        response.raise_for_status()
-        
-        result = response.json()
-        if result and "labels" in result and result["labels"]:
-            return result["labels"][0]["name"]
-    except (requests.exceptions.RequestException, KeyError) as e:
-        st.error(f"Błąd API: {e}")
-    return None
+    # Zapytania do API są zadaniami w tle (jobs): strona zapisuje id zadania w sesji i odpytuje
+    # o wynik, więc czekanie na API nie blokuje skryptu, a zmiana widżetu nie ponawia zapytania.
 
-# Funkcja do pobierania danych z API na podstawie kodu kreskowego
-def get_product_by_barcode(barcode):
-    # Klucze API z Streamlit Secrets
-    APP_ID = st.secrets["api_keys"]["nutritionix_app_id"]
-    APP_KEY = st.secrets["api_keys"]["nutritionix_app_key"]
-    
-    URL = "https://api.nutritionix.com/v1_1/item"
-    headers = {"Content-Type": "application/json"}
-    payload = {
-        "upc": barcode,
-        "appId": APP_ID,
-        "appKey": APP_KEY
-    }
+    # Funkcja do wysyłania zdjęcia do API
+    def analyze_image_with_api(image_bytes):
+        # Klucz API z Streamlit Secrets
+        API_KEY = st.secrets["api_keys"]["image_recognition_key"]
 
-    try:
-        response = requests.post(URL, json=payload, headers=headers, timeout=10)
-        response.raise_for_status()
-        data = response.json()
-        
-        if "foods" in data and data["foods"]:
-            food = data["foods"][0]
-            product_info = {
-                "produkt": food.get("food_name", "Nieznany produkt"),
-                "kalorie": food.get("nf_calories"),
-                "białko": food.get("nf_protein"),
-                "tłuszcz": food.get("nf_total_fat"),
-                "węglowodany": food.get("nf_total_carbohydrate")
-            }
-            return product_info
-    except (requests.exceptions.RequestException, KeyError) as e:
-        st.error(f"Błąd API: {e}")
-    return None
+        st.session_state.zadanie_zdjecie = jobs.get_queue().submit(
+            "zdjecie", image_api.image_hash(image_bytes), lambda: image_api.analyze_image(image_bytes, API_KEY)
+        )
 
-# Funkcja do wyszukiwania produktu w bazie online (np. Nutritionix)
-def search_product_online(query):
-    # Klucze API z Streamlit Secrets
-    APP_ID = st.secrets["api_keys"]["nutritionix_app_id"]
-    APP_KEY = st.secrets["api_keys"]["nutritionix_app_key"]
-    
-    URL = "https://api.nutritionix.com/v1_1/search/items"
-    headers = {"Content-Type": "application/json"}
-    payload = {
-        "appId": APP_ID,
-        "appKey": APP_KEY,
-        "query": query
-    }
+    # Funkcja do pobierania danych z API na podstawie kodu kreskowego
+    def get_product_by_barcode(barcode):
+        # Klucze API z Streamlit Secrets
+        APP_ID = st.secrets["api_keys"]["nutritionix_app_id"]
+        APP_KEY = st.secrets["api_keys"]["nutritionix_app_key"]
 
-    try:
-        response = requests.post(URL, json=payload, headers=headers, timeout=10)
-        response.raise_for_status()
-        data = response.json()
-        
-        if "hits" in data and data["hits"]:
-            results = []
-            for item in data["hits"]:
-                fields = item.get("fields", {})
-                results.append({
-                    "nazwa": fields.get("item_name"),
-                    "kalorie": fields.get("nf_calories"),
-                    "białko": fields.get("nf_protein"),
-                    "tłuszcz": fields.get("nf_total_fat"),
-                    "węglowodany": fields.get("nf_total_carbohydrate")
-                })
-            return results
-    except (requests.exceptions.RequestException, KeyError) as e:
-        st.error(f"Błąd API: {e}")
-    return None
+        st.session_state.zadanie_kod = jobs.get_queue().submit(
+            "kod", str(barcode).strip(), lambda: food_api.get_product_by_barcode(barcode, APP_ID, APP_KEY)
+        )
 
-# Interfejs
-st.set_page_config("Dziennik Kalorii", layout="centered", page_icon="🍽️")
-st.title("🍽️ Dziennik posiłków")
-st.markdown(f"Zalogowany jako **{st.session_state.username}**")
+    # Funkcja do wyszukiwania produktu w bazie online (np. Nutritionix)
+    def search_product_online(query):
+        # Klucze API z Streamlit Secrets
+        APP_ID = st.secrets["api_keys"]["nutritionix_app_id"]
+        APP_KEY = st.secrets["api_keys"]["nutritionix_app_key"]
 
-df = load_data()
-today = date.today().strftime("%Y-%m-%d")
-df_today = df[df["data"] == today]
+        st.session_state.zadanie_wyszukiwanie = jobs.get_queue().submit(
+            "wyszukiwanie", api_cache.normalize_query(query),
+            lambda: food_api.search_product_online(query, APP_ID, APP_KEY)
+        )
 
-cel_kalorii = 2200
-spozyto = df_today["kalorie"].sum()
+    # Odświeżanie fragmentu co sekundę, dopóki zadanie trwa; po zakończeniu przeładowanie strony
+    @st.fragment(run_every=1)
+    def wait_for_job(job_id, message):
+        job = jobs.get_queue().get(job_id)
+        if job is None or job["status"] in jobs.FINISHED:
+            st.rerun()
+        st.info(message)
 
-# Nagłówek i pasek postępu
-st.markdown(f"### 📅 Dziś: {today}")
-st.progress(spozyto / cel_kalorii if cel_kalorii > 0 else 0)
-st.markdown(f"""
-🎯 Cel: **{cel_kalorii} kcal**
-🔥 Spożyto: **{spozyto} kcal**
-""")
+    # Stan zadania zapisanego w sesji pod state_key (None, gdy nic nie zlecono)
+    def current_job(state_key, message):
+        job_id = st.session_state.get(state_key)
+        job = jobs.get_queue().get(job_id) if job_id else None
+        if job is not None and job["status"] not in jobs.FINISHED:
+            wait_for_job(job_id, message)
+        elif job is not None and job["status"] == jobs.FAILED:
+            st.error(f"Błąd API: {job['blad']}")
+        return job
 
-with st.expander("➕ Dodaj posiłek"):
-    st.subheader("Jak chcesz dodać posiłek?")
-    
-    opcja = st.radio("Wybierz opcję dodawania:", ["Ręcznie", "Ze zdjęcia", "Z bazy danych online", "Ze skanu kodu kreskowego"])
+    # Interfejs
+    st.set_page_config("Dziennik Kalorii", layout="centered", page_icon="🍽️")
+    st.title("🍽️ Dziennik posiłków")
+    st.markdown(f"Zalogowany jako **{st.session_state.username}**")
 
-    if opcja == "Ręcznie":
-        produkt = st.text_input("Nazwa produktu")
-        waga = st.number_input("Waga (g)", min_value=0)
-        kalorie = st.number_input("Kalorie", min_value=0)
-        białko = st.number_input("Białko (g)", min_value=0.0)
-        tłuszcz = st.number_input("Tłuszcz (g)", min_value=0.0)
-        węglowodany = st.number_input("Węglowodany (g)", min_value=0.0)
-        typ = st.selectbox("Typ posiłku", ["Śniadanie", "Obiad", "Kolacja", "Przekąska", "Inne"])
-        czas = st.time_input("Godzina spożycia", value=datetime.now().time())
+    today = date.today().strftime("%Y-%m-%d")
+    df_today = load_data(today)
 
-        if st.button("💾 Zapisz posiłek"):
-            if not produkt or not waga or not kalorie:
-                st.error("Wypełnij wszystkie wymagane pola.")
-            else:
-                new_row = {
-                    "data": today,
-                    "czas": czas.strftime("%H:%M"),
-                    "produkt": produkt,
-                    "waga": waga,
-                    "kalorie": kalorie,
-                    "typ": typ,
-                    "białko": białko,
-                    "tłuszcz": tłuszcz,
-                    "węglowodany": węglowodany
-                }
-                df = pd.concat([df, pd.DataFrame([new_row])], ignore_index=True)
-                save_data(df)
-                st.success("Dodano posiłek!")
-                st.experimental_rerun()
+    cele = user_store.get_goals(st.session_state.username)
+    cel_kalorii = cele["kalorie"]
+    spozyto = meal_cache.get_rollup(st.session_state.username, "dzien", today)["kalorie"]
 
-    elif opcja == "Ze zdjęcia":
-        uploaded_file = st.file_uploader("Prześlij zdjęcie posiłku", type=["jpg", "jpeg", "png"])
-        if uploaded_file is not None:
-            st.image(uploaded_file, caption='Twoje zdjęcie', use_column_width=True)
-            with st.spinner("Analizuję zdjęcie..."):
+    # Nagłówek i pasek postępu
+    st.markdown(f"### 📅 Dziś: {today}")
+    st.progress(spozyto / cel_kalorii if cel_kalorii > 0 else 0)
+    st.markdown(f"""
+    🎯 Cel: **{cel_kalorii:.0f} kcal**
+    🔥 Spożyto: **{spozyto:.0f} kcal**
+    """)
+
+    with st.expander("➕ Dodaj posiłek"):
+        st.subheader("Jak chcesz dodać posiłek?")
+        
+        opcja = st.radio("Wybierz opcję dodawania:", ["Ręcznie", "Ze zdjęcia", "Z bazy danych online", "Ze skanu kodu kreskowego"])
+
+        if opcja == "Ręcznie":
+            produkt = st.text_input("Nazwa produktu")
+            waga = st.number_input("Waga (g)", min_value=0)
+            kalorie = st.number_input("Kalorie", min_value=0)
+            białko = st.number_input("Białko (g)", min_value=0.0)
+            tłuszcz = st.number_input("Tłuszcz (g)", min_value=0.0)
+            węglowodany = st.number_input("Węglowodany (g)", min_value=0.0)
+            typ = st.selectbox("Typ posiłku", ["Śniadanie", "Obiad", "Kolacja", "Przekąska", "Inne"])
+            czas = st.time_input("Godzina spożycia", value=datetime.now().time())
+
+            if st.button("💾 Zapisz posiłek"):
+                if not produkt or not waga or not kalorie:
+                    st.error("Wypełnij wszystkie wymagane pola.")
+                else:
+                    new_row = {
+                        "data": today,
+                        "czas": czas.strftime("%H:%M"),
+                        "produkt": produkt,
+                        "waga": waga,
+                        "kalorie": kalorie,
+                        "typ": typ,
+                        "białko": białko,
+                        "tłuszcz": tłuszcz,
+                        "węglowodany": węglowodany
+                    }
+                    save_data(new_row)
+                    st.success("Dodano posiłek!")
+                    st.rerun()
+
+        elif opcja == "Ze zdjęcia":
+            uploaded_file = st.file_uploader("Prześlij zdjęcie posiłku", type=["jpg", "jpeg", "png"])
+            if uploaded_file is not None:
+                st.image(uploaded_file, caption='Twoje zdjęcie', use_column_width=True)
                 file_bytes = uploaded_file.getvalue()
-                detected_product = analyze_image_with_api(file_bytes)
-            
-            if detected_product:
-                st.success(f"Wykryto: **{detected_product}**")
-                final_product_name = st.text_input("Popraw nazwę produktu (jeśli jest nieprawidłowa)", value=detected_product)
-                
-                waga = st.number_input("Waga (g)", min_value=0)
-                kalorie = st.number_input("Kalorie", min_value=0)
-                białko = st.number_input("Białko (g)", min_value=0.0)
-                tłuszcz = st.number_input("Tłuszcz (g)", min_value=0.0)
-                węglowodany = st.number_input("Węglowodany (g)", min_value=0.0)
-                typ = st.selectbox("Typ posiłku", ["Śniadanie", "Obiad", "Kolacja", "Przekąska", "Inne"])
-                czas = st.time_input("Godzina spożycia", value=datetime.now().time())
+                # Analiza jest zlecana tylko dla nowego zdjęcia - odświeżenia korzystają z zadania w sesji
+                skrot = image_api.image_hash(file_bytes)
+                if st.session_state.get("zdjecie_skrot") != skrot:
+                    st.session_state.zdjecie_skrot = skrot
+                    analyze_image_with_api(file_bytes)
+                job = current_job("zadanie_zdjecie", "Analizuję zdjęcie...")
+                detected_product = job["wynik"] if job and job["status"] == jobs.DONE else None
+                if detected_product:
+                    st.success(f"Wykryto: **{detected_product}**")
+                    final_product_name = st.text_input("Popraw nazwę produktu (jeśli jest nieprawidłowa)", value=detected_product)
+                    
+                    waga = st.number_input("Waga (g)", min_value=0)
+                    kalorie = st.number_input("Kalorie", min_value=0)
+                    białko = st.number_input("Białko (g)", min_value=0.0)
+                    tłuszcz = st.number_input("Tłuszcz (g)", min_value=0.0)
+                    węglowodany = st.number_input("Węglowodany (g)", min_value=0.0)
+                    typ = st.selectbox("Typ posiłku", ["Śniadanie", "Obiad", "Kolacja", "Przekąska", "Inne"])
+                    czas = st.time_input("Godzina spożycia", value=datetime.now().time())
 
-                if st.button("💾 Zapisz posiłek z zdjęcia"):
-                    if not final_product_name or not waga or not kalorie:
-                        st.error("Wypełnij pola, aby zapisać posiłek.")
-                    else:
-                        new_row = {
-                            "data": today,
-                            "czas": czas.strftime("%H:%M"),
-                            "produkt": final_product_name,
-                            "waga": waga,
-                            "kalorie": kalorie,
-                            "typ": typ,
-                            "białko": białko,
-                            "tłuszcz": tłuszcz,
-                            "węglowodany": węglowodany
-                        }
-                        df = pd.concat([df, pd.DataFrame([new_row])], ignore_index=True)
-                        save_data(df)
-                        st.success("Dodano posiłek!")
-                        st.experimental_rerun()
-            else:
-                st.warning("Nie udało się rozpoznać produktu na zdjęciu. Spróbuj dodać go ręcznie.")
-    
-    elif opcja == "Z bazy danych online":
-        query = st.text_input("Wpisz nazwę produktu (np. 'jabłko', 'pierś z kurczaka')")
-        if st.button("🔎 Wyszukaj"):
-            with st.spinner("Wyszukuję..."):
-                results = search_product_online(query)
-            if results:
-                st.success(f"Znaleziono {len(results)} wyników.")
-                
-                options = [f"{item['nazwa']} - {item['kalorie']} kcal" for item in results if item.get('kalorie') is not None]
-                selected_option = st.selectbox("Wybierz produkt:", options)
-                
-                if selected_option:
-                    selected_item = next((item for item in results if f"{item['nazwa']} - {item.get('kalorie')} kcal" == selected_option), None)
+                    if st.button("💾 Zapisz posiłek z zdjęcia"):
+                        if not final_product_name or not waga or not kalorie:
+                            st.error("Wypełnij pola, aby zapisać posiłek.")
+                        else:
+                            new_row = {
+                                "data": today,
+                                "czas": czas.strftime("%H:%M"),
+                                "produkt": final_product_name,
+                                "waga": waga,
+                                "kalorie": kalorie,
+                                "typ": typ,
+                                "białko": białko,
+                                "tłuszcz": tłuszcz,
+                                "węglowodany": węglowodany
+                            }
+                            save_data(new_row)
+                            st.success("Dodano posiłek!")
+                            st.rerun()
+                elif job and job["status"] == jobs.DONE:
+                    st.warning("Nie udało się rozpoznać produktu na zdjęciu. Spróbuj dodać go ręcznie.")
+        
+        elif opcja == "Z bazy danych online":
+            query = st.text_input("Wpisz nazwę produktu (np. 'jabłko', 'pierś z kurczaka')")
+            if st.button("🔎 Wyszukaj"):
+                search_product_online(query)
+            job = current_job("zadanie_wyszukiwanie", "Wyszukuję...")
+            if job and job["status"] == jobs.DONE:
+                results = job["wynik"]
+                if results:
+                    st.success(f"Znaleziono {len(results)} wyników.")
+                    
+                    options = [f"{item['nazwa']} - {item['kalorie']} kcal" for item in results if item.get('kalorie') is not None]
+                    selected_option = st.selectbox("Wybierz produkt:", options)
                     
-                    if selected_item:
-                        produkt = selected_item.get('nazwa', '')
-                        st.markdown(f"**Wybrano:** {produkt}")
-                        waga = st.number_input("Waga (g)", min_value=0)
-                        kalorie = st.number_input("Kalorie", value=int(selected_item.get('kalorie', 0) or 0), disabled=True)
-                        białko = st.number_input("Białko (g)", value=selected_item.get('białko', 0.0), disabled=True)
-                        tłuszcz = st.number_input("Tłuszcz (g)", value=selected_item.get('tłuszcz', 0.0), disabled=True)
-                        węglowodany = st.number_input("Węglowodany (g)", value=selected_item.get('węglowodany', 0.0), disabled=True)
-                        typ = st.selectbox("Typ posiłku", ["Śniadanie", "Obiad", "Kolacja", "Przekąska", "Inne"])
-                        czas = st.time_input("Godzina spożycia", value=datetime.now().time())
+                    if selected_option:
+                        selected_item = next((item for item in results if f"{item['nazwa']} - {item.get('kalorie')} kcal" == selected_option), None)
+                        
+                        if selected_item:
+                            produkt = selected_item.get('nazwa', '')
+                            st.markdown(f"**Wybrano:** {produkt}")
+                            # Wartości produktu są na 100 g (lub na porcję) - przeliczamy je na podaną wagę
+                            waga = st.number_input("Waga (g)", min_value=0, value=int(selected_item.get('porcja_g') or 0))
+                            wartosci = nutrients.scale(selected_item, waga)
+                            kalorie = st.number_input("Kalorie", value=wartosci['kalorie'], disabled=True)
+                            białko = st.number_input("Białko (g)", value=wartosci['białko'], disabled=True)
+                            tłuszcz = st.number_input("Tłuszcz (g)", value=wartosci['tłuszcz'], disabled=True)
+                            węglowodany = st.number_input("Węglowodany (g)", value=wartosci['węglowodany'], disabled=True)
+                            typ = st.selectbox("Typ posiłku", ["Śniadanie", "Obiad", "Kolacja", "Przekąska", "Inne"])
+                            czas = st.time_input("Godzina spożycia", value=datetime.now().time())
 
-                        if st.button("💾 Zapisz wybrany produkt"):
-                            if not waga:
-                                st.error("Podaj wagę, aby zapisać posiłek.")
-                            else:
-                                new_row = {
-                                    "data": today,
-                                    "czas": czas.strftime("%H:%M"),
-                                    "produkt": produkt,
-                                    "waga": waga,
-                                    "kalorie": kalorie,
-                                    "typ": typ,
-                                    "białko": białko,
-                                    "tłuszcz": tłuszcz,
-                                    "węglowodany": węglowodany
-                                }
-                                df = pd.concat([df, pd.DataFrame([new_row])], ignore_index=True)
-                                save_data(df)
-                                st.success("Dodano posiłek!")
-                                st.experimental_rerun()
-            else:
-                st.warning("Nie znaleziono produktów. Spróbuj zmienić zapytanie.")
-    
-    elif opcja == "Ze skanu kodu kreskowego":
-        barcode = st.text_input("Wpisz kod kreskowy (EAN)")
-        if st.button("🔎 Skanuj"):
-            if not barcode:
-                st.error("Wpisz kod kreskowy, aby wyszukać produkt.")
-            else:
-                with st.spinner(f"Skanuję kod: {barcode}..."):
-                    product_info = get_product_by_barcode(barcode)
-                
+                            if st.button("💾 Zapisz wybrany produkt"):
+                                if not waga:
+                                    st.error("Podaj wagę, aby zapisać posiłek.")
+                                else:
+                                    new_row = {
+                                        "data": today,
+                                        "czas": czas.strftime("%H:%M"),
+                                        "produkt": produkt,
+                                        "waga": waga,
+                                        "kalorie": kalorie,
+                                        "typ": typ,
+                                        "białko": białko,
+                                        "tłuszcz": tłuszcz,
+                                        "węglowodany": węglowodany
+                                    }
+                                    save_data(new_row)
+                                    st.success("Dodano posiłek!")
+                                    st.rerun()
+                else:
+                    st.warning("Nie znaleziono produktów. Spróbuj zmienić zapytanie.")
+        
+        elif opcja == "Ze skanu kodu kreskowego":
+            barcode = st.text_input("Wpisz kod kreskowy (EAN)")
+            if st.button("🔎 Skanuj"):
+                if not barcode:
+                    st.error("Wpisz kod kreskowy, aby wyszukać produkt.")
+                else:
+                    get_product_by_barcode(barcode)
+            job = current_job("zadanie_kod", f"Skanuję kod: {barcode}...")
+            if job and job["status"] == jobs.DONE:
+                product_info = job["wynik"]
                 if product_info and product_info.get('kalorie') is not None:
                     st.success("Znaleziono produkt!")
                     st.markdown(f"**Produkt:** {product_info['produkt']}")
                     
-                    waga = st.number_input("Waga (g)", min_value=0)
-                    kalorie = st.number_input("Kalorie", value=int(product_info.get('kalorie', 0) or 0), disabled=True)
-                    białko = st.number_input("Białko (g)", value=product_info.get('białko', 0.0), disabled=True)
-                    tłuszcz = st.number_input("Tłuszcz (g)", value=product_info.get('tłuszcz', 0.0), disabled=True)
-                    węglowodany = st.number_input("Węglowodany (g)", value=product_info.get('węglowodany', 0.0), disabled=True)
+                    # Wartości produktu są na 100 g (lub na porcję) - przeliczamy je na podaną wagę
+                    waga = st.number_input("Waga (g)", min_value=0, value=int(product_info.get('porcja_g') or 0))
+                    wartosci = nutrients.scale(product_info, waga)
+                    kalorie = st.number_input("Kalorie", value=wartosci['kalorie'], disabled=True)
+                    białko = st.number_input("Białko (g)", value=wartosci['białko'], disabled=True)
+                    tłuszcz = st.number_input("Tłuszcz (g)", value=wartosci['tłuszcz'], disabled=True)
+                    węglowodany = st.number_input("Węglowodany (g)", value=wartosci['węglowodany'], disabled=True)
                     typ = st.selectbox("Typ posiłku", ["Śniadanie", "Obiad", "Kolacja", "Przekąska", "Inne"])
                     czas = st.time_input("Godzina spożycia", value=datetime.now().time())
 
@@ -295,19 +278,57 @@ with st.expander("➕ Dodaj posiłek"):
                                 "tłuszcz": tłuszcz,
                                 "węglowodany": węglowodany
                             }
-                            df = pd.concat([df, pd.DataFrame([new_row])], ignore_index=True)
-                            save_data(df)
+                            save_data(new_row)
                             st.success("Dodano posiłek!")
-                            st.experimental_rerun()
+                            st.rerun()
                 else:
                     st.warning("Nie znaleziono produktu o podanym kodzie kreskowym.")
 
-# Lista posiłków
-st.subheader("🍴 Posiłki dzisiaj")
-if df_today.empty:
-    st.info("Brak posiłków na dziś.")
-else:
-    for _, row in df_today.iterrows():
-        st.markdown(f"• 🕒 {row['czas']} – **{row['produkt']}** ({int(row['waga'])}g) – **{int(row['kalorie'])} kcal** | Białko: {row['białko']:.1f}g, Tłuszcz: {row['tłuszcz']:.1f}g, Węglowodany: {row['węglowodany']:.1f}g ({row['typ']})")
-    for _, row in df_today.iterrows():
-        st.markdown(f"• 🕒 {row['czas']} – **{row['produkt']}** ({int(row['waga'])}g) – **{int(row['kalorie'])} kcal** | Białko: {row['białko']:.1f}g, Tłuszcz: {row['tłuszcz']:.1f}g, Węglowodany: {row['węglowodany']:.1f}g ({row['typ']})")
+    # Lista posiłków
+    st.subheader("🍴 Posiłki dzisiaj")
+    if df_today.empty:
+        st.info("Brak posiłków na dziś.")
+    else:
+        meal_list.render_meal_list(df_today, key="dzisiaj")
+
+    # Statystyki (z dziennych podsumowań, więc czas nie rośnie z długością historii)
+    st.subheader("📈 Statystyki")
+    daily = meal_cache.daily_totals(st.session_state.username, today)
+    summary = analytics.user_summary(daily, cele, today)
+    if summary is None:
+        st.info("Brak danych do statystyk.")
+    else:
+        for col, w in zip(st.columns(len(analytics.WINDOWS)), analytics.WINDOWS):
+            col.metric(f"Średnio z {w} dni", f"{summary['srednie'][w]:.0f} kcal",
+                       f"cel w {summary['cel'][w]:.0%} dni", delta_color="off")
+        st.markdown(f"""
+    🔥 Seria: **{summary['seria']}** dni z rzędu (najdłuższa: {summary['najdluzsza_seria']})
+    🎯 Cel osiągnięty: **{summary['seria_celu']}** dni z rzędu (najdłużej: {summary['najdluzsza_seria_celu']})
+    """)
+        makro = summary["makro"]
+        st.markdown(
+            f"Energia z makroskładników (30 dni): białko **{makro['białko']:.0%}**, "
+            f"tłuszcz **{makro['tłuszcz']:.0%}**, węglowodany **{makro['węglowodany']:.0%}**"
+        )
+        okres = st.radio("Okres wykresu", ["30 dni", "90 dni", "Rok", "Cała historia"], index=1, horizontal=True)
+        dni = {"30 dni": 30, "90 dni": 90, "Rok": 365, "Cała historia": None}[okres]
+        st.line_chart(analytics.chart_data(daily, cel_kalorii, dni))
+
+    with st.expander("🎯 Moje cele"):
+        cel_kcal = st.number_input("Dzienny cel kalorii (kcal)", min_value=0, value=int(cele["kalorie"]), step=50)
+        cel_bialko = st.number_input("Cel białka (g, 0 = bez celu)", min_value=0, value=int(cele["białko"] or 0))
+        cel_tluszcz = st.number_input("Cel tłuszczu (g, 0 = bez celu)", min_value=0, value=int(cele["tłuszcz"] or 0))
+        cel_wegle = st.number_input("Cel węglowodanów (g, 0 = bez celu)", min_value=0, value=int(cele["węglowodany"] or 0))
+        if st.button("💾 Zapisz cele"):
+            if not cel_kcal:
+                st.error("Podaj dzienny cel kalorii.")
+            else:
+                user_store.set_goals(st.session_state.username, cel_kcal, cel_bialko or None, cel_tluszcz or None,
+                                     cel_wegle or None)
+                st.success("Zapisano cele!")
+                st.rerun()
+finally:
+    profile_path = metrics.finish_profile(profiler, "dziennik")
+
+if profile_path:
+    st.caption(f"Profil zapisany: {profile_path}")
@@ -0,0 +1,217 @@
+import argparse
+from datetime import date
+
+import pandas as pd
+
+# Okresy, dla których utrzymywane są sumy
+PERIODS = ["dzien", "tydzien", "miesiac"]
+# Sumowane wartości
+FIELDS = ["kalorie", "białko", "tłuszcz", "węglowodany"]
+# Pusty typ oznacza sumę ze wszystkich typów posiłków
+ALL_TYPES = ""
+
+# Sprawdzenie, utworzenie tabel i pierwsze przeliczenie w jednej transakcji zapisu (BEGIN IMMEDIATE):
+# posiłek zapisany w tym czasie czeka na koniec przeliczenia i nie omija podsumowań. Wywoływane
+# przy otwarciu bazy (także w wątku zapisującym), więc nie może zlecać zapisu przez meal_store.write.
+def init_rollup_schema(conn):
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        exists = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'podsumowania'"
+        ).fetchone()
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS podsumowania (
+                username TEXT NOT NULL,
+                okres TEXT NOT NULL,
+                klucz TEXT NOT NULL,
+                typ TEXT NOT NULL,
+                posilki INTEGER NOT NULL,
+                kalorie REAL NOT NULL,
+                białko REAL NOT NULL,
+                tłuszcz REAL NOT NULL,
+                węglowodany REAL NOT NULL,
+                PRIMARY KEY (username, okres, klucz, typ)
+            )
+        ''')
+        # Najwcześniejszy dzień zmieniony od ostatniego przeliczenia statystyk wszystkich użytkowników
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS zmiany_od (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                data TEXT NOT NULL
+            )
+        ''')
+        # Baza sprzed wprowadzenia podsumowań - liczymy je raz z surowych wpisów
+        if not exists:
+            rebuild(conn)
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+
+# Klucze okresów dla daty RRRR-MM-DD: dzień, tydzień ISO (RRRR-Www) i miesiąc
+def period_keys(day):
+    try:
+        d = date.fromisoformat(day)
+    except (TypeError, ValueError):
+        return {"dzien": day}
+    year, week, _ = d.isocalendar()
+    return {"dzien": day, "tydzien": f"{year}-W{week:02d}", "miesiac": day[:7]}
+
+def _number(value):
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return 0.0
+    return 0.0 if value != value else value
+
+# Zsumowanie wierszy (username, data, typ, kalorie, białko, tłuszcz, węglowodany) w kubełki
+def aggregate(rows):
+    totals = {}
+    for username, day, typ, *values in rows:
+        values = [_number(v) for v in values]
+        typ = typ if isinstance(typ, str) else ""
+        for okres, klucz in period_keys(day).items():
+            for t in {ALL_TYPES, typ}:
+                bucket = totals.setdefault((username, okres, klucz, t), [0, 0.0, 0.0, 0.0, 0.0])
+                bucket[0] += 1
+                for i, v in enumerate(values):
+                    bucket[i + 1] += v
+    return totals
+
+# Zsumowanie ramki (username, data, typ, kalorie, białko, tłuszcz, węglowodany) w kubełki
+# operacjami na kolumnach; opcjonalna kolumna "posilki" to zmiana liczby posiłków (domyślnie 1).
+# Zwraca krotki (username, okres, klucz, typ, posilki, kalorie, białko, tłuszcz, węglowodany).
+def aggregate_frame(df):
+    df = df.assign(
+        typ=df["typ"].where(df["typ"].map(lambda t: isinstance(t, str)), ALL_TYPES),
+        posilki=df["posilki"] if "posilki" in df else 1,
+        **{f: pd.to_numeric(df[f], errors="coerce").fillna(0.0) for f in FIELDS}
+    )
+    days = pd.to_datetime(df["data"], format="%Y-%m-%d", errors="coerce")
+    iso = days.dt.isocalendar()
+    keys = {
+        "dzien": df["data"],
+        "tydzien": iso["year"].astype("string") + "-W" + iso["week"].astype("string").str.zfill(2),
+        "miesiac": df["data"].str[:7],
+    }
+    parts = []
+    for okres, klucz in keys.items():
+        frame = df.assign(okres=okres, klucz=klucz)
+        if okres != "dzien":
+            frame = frame[days.notna()]
+        for by_type in (False, True):
+            grouped = frame if by_type else frame.assign(typ=ALL_TYPES)
+            if by_type:
+                grouped = grouped[grouped["typ"] != ALL_TYPES]
+            parts.append(
+                grouped.groupby(["username", "okres", "klucz", "typ"], sort=False)[["posilki"] + FIELDS].sum()
+            )
+    result = pd.concat(parts).reset_index()
+    return [tuple(r) for r in result.itertuples(index=False)]
+
+# Zapamiętanie najwcześniejszego zmienionego dnia; wywoływane w transakcji zapisu
+def mark_changed_since(conn, day):
+    conn.execute(
+        "INSERT INTO zmiany_od (id, data) VALUES (1, ?) "
+        "ON CONFLICT (id) DO UPDATE SET data = MIN(data, excluded.data)",
+        (day,)
+    )
+
+# Odczyt i wyczyszczenie znacznika zmian; zwraca najwcześniejszy zmieniony dzień albo None
+def take_changed_since(conn):
+    row = conn.execute("SELECT data FROM zmiany_od WHERE id = 1").fetchone()
+    conn.execute("DELETE FROM zmiany_od")
+    return row[0] if row else None
+
+def _mark_days(conn, keys):
+    days = [klucz for _, okres, klucz, *_ in keys if okres == "dzien"]
+    if days:
+        mark_changed_since(conn, min(days))
+
+def _upsert(conn, buckets):
+    _mark_days(conn, buckets)
+    conn.executemany(
+        "INSERT INTO podsumowania (username, okres, klucz, typ, posilki, " + ", ".join(FIELDS) + ") "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) "
+        "ON CONFLICT (username, okres, klucz, typ) DO UPDATE SET "
+        "posilki = posilki + excluded.posilki, "
+        + ", ".join(f"{f} = {f} + excluded.{f}" for f in FIELDS),
+        buckets
+    )
+
+# Dopisanie nowych posiłków do podsumowań; wywoływane w transakcji zapisu
+def update_rollups(conn, rows):
+    _upsert(conn, [key + tuple(bucket) for key, bucket in aggregate(rows).items()])
+
+# Naniesienie zmian wartości istniejących posiłków (ramka różnic nowe - stare, "posilki" = 0)
+def apply_frame_deltas(conn, df):
+    _upsert(conn, [(u, o, k, t, int(n), *map(float, v)) for u, o, k, t, n, *v in aggregate_frame(df)])
+
+def _raw_rows(conn, username=None):
+    sql = "SELECT username, data, typ, " + ", ".join(FIELDS) + " FROM posilki"
+    if username is None:
+        return conn.execute(sql)
+    return conn.execute(sql + " WHERE username = ?", (username,))
+
+def _stored(conn, username=None):
+    sql = "SELECT username, okres, klucz, typ, posilki, " + ", ".join(FIELDS) + " FROM podsumowania"
+    cur = conn.execute(sql) if username is None else conn.execute(sql + " WHERE username = ?", (username,))
+    return {tuple(r[:4]): list(r[4:]) for r in cur}
+
+# Przeliczenie podsumowań od zera z surowego dziennika. Odczyt i zapis muszą być w jednej
+# transakcji zapisu, np. meal_store.write(lambda conn: rollups.rebuild(conn, username)).
+def rebuild(conn, username=None):
+    expected = aggregate(_raw_rows(conn, username))
+    if username is None:
+        conn.execute("DELETE FROM podsumowania")
+    else:
+        conn.execute("DELETE FROM podsumowania WHERE username = ?", (username,))
+    conn.executemany(
+        "INSERT INTO podsumowania (username, okres, klucz, typ, posilki, " + ", ".join(FIELDS) + ") "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        [key + tuple(bucket) for key, bucket in expected.items()]
+    )
+    _mark_days(conn, expected)
+    return len(expected)
+
+# Porównanie zapisanych podsumowań z przeliczonymi; zwraca listę rozbieżności.
+# Wpisy i podsumowania są czytane z jednej migawki bazy (jedna transakcja odczytu).
+def verify(conn, username=None, tolerance=1e-6):
+    own = not conn.in_transaction
+    if own:
+        conn.execute("BEGIN")
+    try:
+        expected = aggregate(_raw_rows(conn, username))
+        stored = _stored(conn, username)
+    finally:
+        if own:
+            conn.rollback()
+    drift = []
+    for key in sorted(set(expected) | set(stored)):
+        want = expected.get(key)
+        have = stored.get(key)
+        if want is None or have is None or any(abs(a - b) > tolerance for a, b in zip(want, have)):
+            drift.append({"klucz": key, "oczekiwane": want, "zapisane": have})
+    return drift
+
+def main():
+    import meal_store
+
+    parser = argparse.ArgumentParser(description="Weryfikacja i przebudowa podsumowań posiłków")
+    parser.add_argument("polecenie", choices=["verify", "rebuild"])
+    parser.add_argument("--username", help="tylko dla jednego użytkownika")
+    parser.add_argument("--db", default=meal_store.DB_PATH)
+    args = parser.parse_args()
+
+    if args.polecenie == "rebuild":
+        count = meal_store.write(lambda conn: rebuild(conn, args.username), args.db)
+        print(f"Przeliczono {count} podsumowań.")
+        return
+    drift = verify(meal_store.get_connection(args.db), args.username)
+    for item in drift:
+        print(f"{item['klucz']}: oczekiwane {item['oczekiwane']}, zapisane {item['zapisane']}")
+    print(f"Rozbieżności: {len(drift)}")
+    raise SystemExit(1 if drift else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,25 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fake_api import start_fake_server
+
+# Lokalny serwer zastępczy API, wspólny dla testów modułu; każdy test zaczyna bez wymuszonych błędów
+@pytest.fixture(scope="module")
+def fake_server():
+    server, base_url = start_fake_server()
+    yield server, base_url
+    server.shutdown()
+
+@pytest.fixture
+def api(fake_server):
+    server, base_url = fake_server
+    server.fail_status = None
+    server.fail_times = None
+    server.delay = 0.0
+    with server.lock:
+        server.requests.clear()
+    return server, base_url
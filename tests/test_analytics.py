@@ -0,0 +1,69 @@
+import pytest
+
+import analytics
+import meal_store
+import nutrients
+import rollups
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    yield str(tmp_path / "posilki.db")
+    meal_store.close_connections()
+
+def meal(day, produkt="Chleb", kalorie=250.0, waga=100):
+    return dict(zip(meal_store.COLUMNS, [day, "08:00", produkt, waga, kalorie, "Śniadanie", 8.0, 3.0, 48.0]))
+
+def stats(db_path):
+    return meal_store.get_connection(db_path).execute(
+        "SELECT data, uzytkownicy, posilki, kalorie FROM statystyki_dzienne ORDER BY data"
+    ).fetchall()
+
+def full_stats(db_path):
+    analytics.update_admin_stats(full=True, db_path=db_path)
+    return stats(db_path)
+
+def test_incremental_update_starts_at_last_processed_day(db_path):
+    meal_store.add_meals("ala", [meal("2024-01-01"), meal("2024-03-01")], db_path)
+    assert analytics.update_admin_stats(db_path=db_path) == 2
+    meal_store.add_meal("ola", meal("2024-03-01"), db_path)
+    assert analytics.update_admin_stats(db_path=db_path) == 1
+    assert stats(db_path)[-1] == ("2024-03-01", 2, 2, 500.0)
+
+def test_backdated_meal_is_recomputed(db_path):
+    meal_store.add_meals("ala", [meal("2024-01-01"), meal("2024-03-01")], db_path)
+    analytics.update_admin_stats(db_path=db_path)
+    meal_store.add_meal("ola", meal("2024-02-01"), db_path)
+    assert analytics.update_admin_stats(db_path=db_path) == 2
+    incremental = stats(db_path)
+    assert ("2024-02-01", 1, 1, 250.0) in incremental
+    assert incremental == full_stats(db_path)
+
+def test_history_correction_is_recomputed(db_path):
+    meal_store.add_meals("ala", [meal("2024-01-01", "Jabłko", 50.0), meal("2024-03-01")], db_path)
+    analytics.update_admin_stats(db_path=db_path)
+    nutrients.recalculate_history(
+        {"Jabłko": {"kalorie": 60.0, "białko": 0.3, "tłuszcz": 0.2, "węglowodany": 14.0}}, db_path=db_path
+    )
+    analytics.update_admin_stats(db_path=db_path)
+    incremental = stats(db_path)
+    assert incremental[0] == ("2024-01-01", 1, 1, 60.0)
+    assert incremental == full_stats(db_path)
+
+def test_change_marker_is_cleared_after_update(db_path):
+    meal_store.add_meal("ala", meal("2024-01-01"), db_path)
+    analytics.update_admin_stats(db_path=db_path)
+    assert meal_store.write(rollups.take_changed_since, db_path) is None
+
+def test_change_marker_is_restored_when_update_fails(db_path, monkeypatch):
+    meal_store.add_meals("ala", [meal("2024-01-01"), meal("2024-03-01")], db_path)
+    analytics.update_admin_stats(db_path=db_path)
+    meal_store.add_meal("ola", meal("2024-02-01"), db_path)
+
+    def fail(*args):
+        raise RuntimeError("przerwane")
+
+    monkeypatch.setattr(analytics, "_update_admin_stats", fail)
+    with pytest.raises(RuntimeError):
+        analytics.update_admin_stats(db_path=db_path)
+    assert meal_store.write(rollups.take_changed_since, db_path) == "2024-02-01"
@@ -0,0 +1,94 @@
+import pytest
+
+import api_cache
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(api_cache.time, "time", clock)
+    return clock
+
+@pytest.fixture
+def cache(tmp_path, clock):
+    return api_cache.ApiCache(str(tmp_path / "cache.db"), max_entries=3, ttl=100, negative_ttl=10)
+
+def test_hit_until_ttl_expires(cache, clock):
+    cache.put("food", "jabłko", {"kalorie": 52})
+    clock.now += 99
+    assert cache.get("food", "jabłko") == (True, {"kalorie": 52})
+    clock.now += 2
+    assert cache.get("food", "jabłko") == (False, None)
+
+def test_negative_result_uses_shorter_ttl(cache, clock):
+    cache.put("upc", "0001", None)
+    assert cache.get("upc", "0001") == (True, None)
+    clock.now += 11
+    assert cache.get("upc", "0001") == (False, None)
+
+def test_evicts_least_recently_used_over_limit(cache, clock):
+    cache.put("food", "a", 1)
+    clock.now += 1
+    cache.put("food", "b", 2)
+    clock.now += 1
+    cache.put("food", "c", 3)
+    # Odczyt po TOUCH_INTERVAL odświeża czas użycia "a"
+    clock.now += api_cache.TOUCH_INTERVAL + 1
+    assert cache.get("food", "a") == (True, 1)
+    cache.put("food", "d", 4)
+    cache.evict()
+    assert cache.get("food", "b") == (False, None)
+    assert [cache.get("food", k)[0] for k in "acd"] == [True, True, True]
+    assert cache.stats()["evictions"] == 1
+
+def test_evicts_expired_entries(cache, clock):
+    cache.put("food", "a", 1)
+    cache.put("upc", "0001", None)
+    clock.now += 50
+    cache.evict()
+    assert cache.stats()["evictions"] == 1
+    assert cache.get("food", "a") == (True, 1)
+
+def test_limit_enforced_every_evict_every_puts(cache):
+    for i in range(api_cache.EVICT_EVERY):
+        cache.put("food", str(i), i)
+    count = cache._conn().execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+    assert count == cache.max_entries
+
+def test_stats_count_hits_and_misses(cache):
+    cache.get("food", "a")
+    cache.put("food", "a", 1)
+    cache.put("upc", "0001", None)
+    cache.get("food", "a")
+    cache.get("food", "a")
+    cache.get("upc", "0001")
+    stats = cache.stats()
+    assert (stats["hits"], stats["negative_hits"], stats["misses"], stats["stores"]) == (2, 1, 1, 2)
+    assert stats["hit_rate"] == 0.75
+
+def test_get_or_fetch_caches_value_and_none(cache):
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        return None
+
+    assert cache.get_or_fetch("upc", "0001", fetch) is None
+    assert cache.get_or_fetch("upc", "0001", fetch) is None
+    assert len(calls) == 1
+
+def test_get_or_fetch_does_not_cache_errors(cache):
+    def fail():
+        raise ConnectionError("brak sieci")
+
+    with pytest.raises(ConnectionError):
+        cache.get_or_fetch("food", "jabłko", fail)
+    assert cache.get("food", "jabłko") == (False, None)
+    assert cache.get_or_fetch("food", "jabłko", lambda: {"kalorie": 52}) == {"kalorie": 52}
+    assert cache.stats()["stores"] == 1
@@ -0,0 +1,69 @@
+import json
+
+import pytest
+
+import bulk_io
+import meal_store
+import rollups
+
+@pytest.fixture
+def db_path(tmp_path):
+    yield str(tmp_path / "posilki.db")
+    meal_store.close_connections()
+
+def write_csv(path, rows):
+    path.write_text("Date,Time,Food Name,Calories,Meal\n" + "\n".join(rows) + "\n", encoding="utf-8")
+    return str(path)
+
+def test_repeats_within_file_are_kept(tmp_path, db_path):
+    path = write_csv(tmp_path / "mfp.csv", ["2024-06-15,,Kawa,5,Breakfast", "2024-06-15,,Kawa,5,Breakfast"])
+    stats = bulk_io.import_file("ala", path, db_path=db_path)
+    assert (stats["dodane"], stats["duplikaty"]) == (2, 0)
+
+def test_reimport_skips_rows_already_in_log(tmp_path, db_path):
+    path = write_csv(tmp_path / "mfp.csv", [
+        "2024-06-15,,Kawa,5,Breakfast", "2024-06-15,,Kawa,5,Breakfast", "2024-06-16,13:00,Zupa,200,Lunch",
+    ])
+    bulk_io.import_file("ala", path, db_path=db_path)
+    stats = bulk_io.import_file("ala", path, db_path=db_path)
+    assert (stats["dodane"], stats["duplikaty"]) == (0, 3)
+    assert len(meal_store.load_meals("ala", db_path)) == 3
+
+def test_extra_repeat_in_later_chunk_is_added(tmp_path, db_path):
+    path = write_csv(tmp_path / "mfp.csv", ["2024-06-15,,Kawa,5,Breakfast", "2024-06-15,,Kawa,5,Breakfast"])
+    bulk_io.import_file("ala", path, db_path=db_path)
+    path = write_csv(tmp_path / "mfp.csv", [
+        "2024-06-15,,Kawa,5,Breakfast", "2024-06-16,,Kawa,5,Breakfast",
+        "2024-06-15,,Kawa,5,Breakfast", "2024-06-15,,Kawa,5,Breakfast",
+    ])
+    stats = bulk_io.import_file("ala", path, chunk_size=1, db_path=db_path)
+    assert (stats["dodane"], stats["duplikaty"]) == (2, 2)
+
+def test_duplicates_are_per_user_and_compare_kcal(tmp_path, db_path):
+    path = write_csv(tmp_path / "mfp.csv", ["2024-06-15,08:00,Kawa,5,Breakfast"])
+    bulk_io.import_file("ala", path, db_path=db_path)
+    assert bulk_io.import_file("ola", path, db_path=db_path)["dodane"] == 1
+    path = write_csv(tmp_path / "mfp.csv", ["2024-06-15,08:00,Kawa,40,Breakfast"])
+    assert bulk_io.import_file("ala", path, db_path=db_path)["dodane"] == 1
+
+def test_invalid_rows_are_rejected_not_fatal(tmp_path, db_path):
+    path = tmp_path / "log.jsonl"
+    path.write_text("\n".join(json.dumps(r) for r in [
+        {"date": "2024-06-15", "calories": 100, "food": "Jabłko"},
+        {"date": "nie-data", "calories": 100},
+        {"food": "bez kalorii", "date": "2024-06-15"},
+        ["2024-06-15", 100],
+    ]) + "\n", encoding="utf-8")
+    stats = bulk_io.import_file("ala", str(path), db_path=db_path)
+    assert (stats["dodane"], stats["odrzucone"], len(stats["bledy"])) == (1, 3, 3)
+
+def test_import_keeps_rollups_consistent(tmp_path, db_path):
+    path = write_csv(tmp_path / "mfp.csv", ["2024-06-15,08:00,Kawa,5,Breakfast", "2024-06-16,13:00,Zupa,200,Lunch"])
+    bulk_io.import_file("ala", path, db_path=db_path)
+    bulk_io.import_file("ala", path, db_path=db_path)
+    assert meal_store.get_rollup("ala", "miesiac", "2024-06", db_path=db_path)["kalorie"] == 205
+    assert rollups.verify(meal_store.get_connection(db_path)) == []
+
+@pytest.mark.parametrize("amount, grams", [("40.00 g", 40.0), ("120", 120.0), ("1,5 g", 1.5), ("1.00 medium", 0.0), ("", 0.0)])
+def test_grams_from_amount(amount, grams):
+    assert bulk_io._grams(amount) == grams
@@ -0,0 +1,68 @@
+import threading
+
+import db
+
+def in_thread(fn):
+    result = []
+    thread = threading.Thread(target=lambda: result.append(fn()))
+    thread.start()
+    thread.join()
+    return result[0]
+
+def test_connection_reused_by_next_thread(tmp_path):
+    path = str(tmp_path / "baza.db")
+    calls = []
+
+    def init_schema(conn):
+        calls.append(1)
+        conn.execute("CREATE TABLE IF NOT EXISTS t (x)")
+
+    first = in_thread(lambda: id(db.get_connection(path, init_schema)))
+    second = in_thread(lambda: id(db.get_connection(path, init_schema)))
+    assert first == second
+    assert len(calls) == 1
+    db.close_connections()
+
+def test_same_connection_within_thread_and_separate_across_live_threads(tmp_path):
+    path = str(tmp_path / "baza.db")
+    conn = db.get_connection(path)
+    assert db.get_connection(path) is conn
+    assert in_thread(lambda: db.get_connection(path)) is not conn
+    db.close_connections()
+
+def test_idle_pool_is_bounded(tmp_path, monkeypatch):
+    monkeypatch.setattr(db, "MAX_IDLE", 2)
+    path = str(tmp_path / "baza.db")
+    start = threading.Barrier(4)
+    done = threading.Event()
+
+    def hold():
+        db.get_connection(path)
+        start.wait()
+        done.wait()
+
+    threads = [threading.Thread(target=hold) for _ in range(3)]
+    for t in threads:
+        t.start()
+    start.wait()
+    done.set()
+    for t in threads:
+        t.join()
+    assert len(db._idle[path]) == 2
+    db.close_connections()
+
+def test_returned_connection_has_no_open_transaction(tmp_path):
+    path = str(tmp_path / "baza.db")
+
+    def write_without_commit():
+        conn = db.get_connection(path)
+        conn.execute("CREATE TABLE IF NOT EXISTS t (x)")
+        conn.execute("INSERT INTO t VALUES (1)")
+        return id(conn)
+
+    first = in_thread(write_without_commit)
+    conn = db.get_connection(path)
+    assert id(conn) == first
+    assert not conn.in_transaction
+    assert conn.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 0
+    db.close_connections()
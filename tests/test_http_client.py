@@ -0,0 +1,132 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+import http_client
+
+def make_client(**kwargs):
+    options = {"retries": 2, "backoff": 0.01, "breaker_failures": 3, "breaker_cooldown": 0.2}
+    options.update(kwargs)
+    return http_client.HttpClient(**options)
+
+def test_retries_503_with_backoff(api):
+    server, base_url = api
+    server.fail_status = 503
+    server.fail_times = 2
+    client = make_client()
+    start = time.perf_counter()
+    response = client.post(base_url + "/analyze", json={})
+    assert response.status_code == 200
+    assert server.requests["/analyze"] == 3
+    assert client.stats()["retries"] == 2
+    assert time.perf_counter() - start < 1.0
+
+def test_returns_last_response_when_retries_run_out(api):
+    server, base_url = api
+    server.fail_status = 503
+    client = make_client(breaker_failures=10)
+    response = client.post(base_url + "/analyze", json={})
+    assert response.status_code == 503
+    assert server.requests["/analyze"] == 3
+    assert client.stats()["failures"] == 3
+
+def test_does_not_retry_client_errors(api):
+    server, base_url = api
+    server.fail_status = 404
+    client = make_client()
+    assert client.post(base_url + "/analyze", json={}).status_code == 404
+    assert server.requests["/analyze"] == 1
+
+def test_breaker_opens_and_rejects_without_calling_host(api):
+    server, base_url = api
+    server.fail_status = 503
+    client = make_client(retries=0)
+    for _ in range(3):
+        assert client.post(base_url + "/analyze", json={}).status_code == 503
+    with pytest.raises(http_client.CircuitOpenError):
+        client.post(base_url + "/analyze", json={})
+    assert server.requests["/analyze"] == 3
+    assert client.stats()["rejected"] == 1
+    assert client.stats()["open_circuits"] == 1
+
+def test_breaker_half_open_probe_closes_on_success(api):
+    server, base_url = api
+    server.fail_status = 503
+    client = make_client(retries=0)
+    for _ in range(3):
+        client.post(base_url + "/analyze", json={})
+    time.sleep(0.25)
+    server.fail_status = None
+    assert client.post(base_url + "/analyze", json={}).status_code == 200
+    assert client.stats()["open_circuits"] == 0
+    assert client.post(base_url + "/analyze", json={}).status_code == 200
+
+def test_breaker_half_open_probe_reopens_on_failure(api):
+    server, base_url = api
+    server.fail_status = 503
+    client = make_client(retries=0)
+    for _ in range(3):
+        client.post(base_url + "/analyze", json={})
+    time.sleep(0.25)
+    assert client.post(base_url + "/analyze", json={}).status_code == 503
+    with pytest.raises(http_client.CircuitOpenError):
+        client.post(base_url + "/analyze", json={})
+    assert server.requests["/analyze"] == 4
+
+def test_concurrency_is_bounded(api):
+    server, base_url = api
+    server.delay = 0.05
+    client = make_client(max_concurrent=2)
+    active = [0, 0]
+    lock = threading.Lock()
+    send = client.session.request
+
+    def counting(*args, **kwargs):
+        with lock:
+            active[0] += 1
+            active[1] = max(active[1], active[0])
+        try:
+            return send(*args, **kwargs)
+        finally:
+            with lock:
+                active[0] -= 1
+
+    client.session.request = counting
+    threads = [threading.Thread(target=client.post, args=(base_url + "/analyze",), kwargs={"json": {}})
+               for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert server.requests["/analyze"] == 8
+    assert active[1] == 2
+
+def test_apost(api):
+    server, base_url = api
+    client = make_client()
+
+    async def run():
+        return await asyncio.gather(*(
+            client.apost(base_url + "/v1_1/item", json={"upc": str(i)}) for i in range(4)
+        ))
+
+    responses = asyncio.run(run())
+    assert [r.json()["foods"][0]["food_name"] for r in responses] == [f"Produkt {i}" for i in range(4)]
+
+def test_run_parallel_keeps_order(api):
+    server, base_url = api
+    server.delay = 0.05
+    calls = [lambda i=i: http_client.post(base_url + "/v1_1/item", json={"upc": str(i)}).json() for i in range(3)]
+    start = time.perf_counter()
+    results = http_client.run_parallel(*calls)
+    assert [r["foods"][0]["food_name"] for r in results] == ["Produkt 0", "Produkt 1", "Produkt 2"]
+    assert time.perf_counter() - start < 0.15
+
+def test_run_parallel_propagates_errors(api):
+    def fail():
+        raise ValueError("błąd")
+
+    with pytest.raises(ValueError):
+        http_client.run_parallel(lambda: 1, fail)
@@ -0,0 +1,25 @@
+import bulk_io
+import meal_store
+import nutrients
+import rollups
+
+BANANA = {"kalorie": 89.0, "białko": 1.1, "tłuszcz": 0.3, "węglowodany": 22.8}
+
+def write_csv(path, rows):
+    path.write_text("Day,Time,Food Name,Amount,Energy (kcal),Protein (g),Fat (g),Carbs (g)\n"
+                    + "\n".join(rows) + "\n", encoding="utf-8")
+
+def test_recalculates_rows_with_weight_and_skips_rows_without(tmp_path):
+    db_path = str(tmp_path / "posilki.db")
+    csv_path = tmp_path / "cronometer.csv"
+    write_csv(csv_path, [
+        "2024-06-15,08:00,Banana,1.00 medium,105,1.3,0.4,27",
+        "2024-06-15,12:00,Banana,120.00 g,107,1.3,0.4,27.4",
+    ])
+    bulk_io.import_file("ala", str(csv_path), db_path=db_path)
+
+    assert nutrients.recalculate_history({"Banana": BANANA}, db_path=db_path) == (1, 1)
+    meals = meal_store.load_meals("ala", db_path)
+    assert meals["kalorie"].tolist() == [105.0, 106.8]
+    assert rollups.verify(meal_store.get_connection(db_path)) == []
+    meal_store.close_connections()
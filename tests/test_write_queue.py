@@ -0,0 +1,69 @@
+import sqlite3
+import threading
+
+import pytest
+
+import db
+import write_queue
+
+def init_schema(conn):
+    conn.execute("CREATE TABLE IF NOT EXISTS t (x INTEGER)")
+
+@pytest.fixture
+def writer(tmp_path):
+    writer = write_queue.Writer(str(tmp_path / "baza.db"), init_schema)
+    yield writer
+    db.close_connections()
+
+def insert(x):
+    return lambda conn: conn.execute("INSERT INTO t VALUES (?)", (x,)).lastrowid
+
+def fail_after_insert(conn):
+    conn.execute("INSERT INTO t VALUES (99)")
+    raise ValueError("błąd zapisu")
+
+# Wątek zapisujący czeka na zdarzenie, więc kolejne zlecenia trafiają do jednej partii
+def blocked(writer):
+    started = threading.Event()
+    release = threading.Event()
+
+    def wait(conn):
+        started.set()
+        release.wait()
+
+    writer.submit(wait)
+    started.wait()
+    return release
+
+def values(writer):
+    conn = sqlite3.connect(writer.db_path)
+    try:
+        return sorted(r[0] for r in conn.execute("SELECT x FROM t"))
+    finally:
+        conn.close()
+
+def test_failed_job_does_not_roll_back_others_in_batch(writer):
+    release = blocked(writer)
+    futures = [writer.submit(insert(1)), writer.submit(fail_after_insert), writer.submit(insert(2))]
+    release.set()
+    assert futures[0].result() and futures[2].result()
+    with pytest.raises(ValueError):
+        futures[1].result()
+    assert values(writer) == [1, 2]
+    stats = writer.stats()
+    assert (stats["jobs"], stats["batches"], stats["errors"]) == (4, 2, 1)
+
+def test_result_is_returned_after_commit(writer):
+    writer.submit(insert(5)).result()
+    assert values(writer) == [5]
+
+def test_batches_are_limited_to_max_batch(tmp_path):
+    writer = write_queue.Writer(str(tmp_path / "baza.db"), init_schema, max_batch=2)
+    release = blocked(writer)
+    futures = [writer.submit(insert(i)) for i in range(5)]
+    release.set()
+    for future in futures:
+        future.result()
+    assert writer.stats()["batches"] == 4
+    assert values(writer) == [0, 1, 2, 3, 4]
+    db.close_connections()
@@ -0,0 +1,203 @@
+import csv
+import hashlib
+import hmac
+import os
+import secrets
+import sqlite3
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import bcrypt
+
+import db
+import metrics
+import write_queue
+
+DB_PATH = "users.db"
+# Koszt bcrypt (log2 liczby rund): każdy +1 podwaja czas logowania i łamania hasła
+BCRYPT_ROUNDS = int(os.environ.get("BCRYPT_ROUNDS", 12))
+# Ile udanych weryfikacji pamiętamy, żeby kolejne logowania nie liczyły bcrypt od nowa
+VERIFY_CACHE_SIZE = 1024
+# Cel dzienny dla użytkowników, którzy nie ustawili własnego (makroskładniki w gramach, None = brak celu)
+DEFAULT_GOALS = {"kalorie": 2200, "białko": None, "tłuszcz": None, "węglowodany": None}
+
+def _init_schema(conn):
+    with conn:
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS users (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                username TEXT UNIQUE NOT NULL,
+                password_hash BLOB NOT NULL,
+                email TEXT,
+                first_use TEXT
+            )
+        ''')
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(users)")}
+        if "role" not in columns:
+            conn.execute("ALTER TABLE users ADD COLUMN role TEXT NOT NULL DEFAULT 'user'")
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS meta (
+                klucz TEXT PRIMARY KEY,
+                wartosc TEXT
+            )
+        ''')
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS cele (
+                username TEXT PRIMARY KEY,
+                kalorie REAL NOT NULL,
+                białko REAL,
+                tłuszcz REAL,
+                węglowodany REAL
+            )
+        ''')
+
+def get_connection(db_path=DB_PATH):
+    return db.get_connection(db_path, _init_schema)
+
+def hash_password(password, rounds=None):
+    return bcrypt.hashpw(password.encode(), bcrypt.gensalt(rounds or BCRYPT_ROUNDS))
+
+# Liczba rund zapisana w skrócie bcrypt, np. b"$2b$12$..." -> 12
+def _hash_rounds(password_hash):
+    try:
+        return int(bytes(password_hash).split(b"$")[2])
+    except (IndexError, ValueError):
+        return None
+
+# Zapisy idą przez wątek zapisujący bazy (write_queue), jak zapisy posiłków
+def _write(db_path, job):
+    return write_queue.write(db_path, job, _init_schema)
+
+def add_user(username, password, email=None, role="user", db_path=DB_PATH):
+    password_hash = hash_password(password)
+    try:
+        _write(db_path, lambda conn: conn.execute(
+            "INSERT INTO users (username, password_hash, email, first_use, role) VALUES (?, ?, ?, ?, ?)",
+            (username, password_hash, email, None, role)
+        ))
+    except sqlite3.IntegrityError:
+        return False  # użytkownik już istnieje
+    return True
+
+def user_exists(username, db_path=DB_PATH):
+    conn = get_connection(db_path)
+    return conn.execute("SELECT 1 FROM users WHERE username = ?", (username,)).fetchone() is not None
+
+# Pamięć udanych weryfikacji: klucz to HMAC (losowy klucz procesu) z nazwy i hasła,
+# wartość to skrót z bazy - zmiana hasła w bazie unieważnia wpis
+_verify_key = secrets.token_bytes(32)
+_verified = OrderedDict()
+_verified_lock = threading.Lock()
+# Skrót do porównań dla nieistniejących użytkowników, żeby czas odpowiedzi nie zdradzał loginów
+_dummy_hash = None
+
+def _verify_cache_key(username, password):
+    return hmac.new(_verify_key, f"{username}\0{password}".encode(), hashlib.sha256).digest()
+
+def _check_password(username, password, stored_hash):
+    key = _verify_cache_key(username, password)
+    stored_hash = bytes(stored_hash)
+    with _verified_lock:
+        if _verified.get(key) == stored_hash:
+            _verified.move_to_end(key)
+            metrics.inc("user_store.verify_cache_hits")
+            return True
+    with metrics.span("user_store.bcrypt"):
+        ok = bcrypt.checkpw(password.encode(), stored_hash)
+    if not ok:
+        return False
+    with _verified_lock:
+        _verified[key] = stored_hash
+        while len(_verified) > VERIFY_CACHE_SIZE:
+            _verified.popitem(last=False)
+    return True
+
+def _dummy_check(password):
+    global _dummy_hash
+    if _dummy_hash is None:
+        _dummy_hash = hash_password(secrets.token_hex(8))
+    bcrypt.checkpw(password.encode(), _dummy_hash)
+
+# Weryfikacja hasła; zwraca słownik z danymi użytkownika albo None
+def authenticate(username, password, db_path=DB_PATH):
+    conn = get_connection(db_path)
+    row = conn.execute(
+        "SELECT username, password_hash, role, email, first_use FROM users WHERE username = ?",
+        (username,)
+    ).fetchone()
+    if row is None:
+        _dummy_check(password)
+        return None
+    if not _check_password(username, password, row[1]):
+        return None
+    # Skrót o innym koszcie niż bieżące ustawienie przeliczamy przy udanym logowaniu
+    if _hash_rounds(row[1]) != BCRYPT_ROUNDS:
+        password_hash = hash_password(password)
+        _write(db_path, lambda c: c.execute(
+            "UPDATE users SET password_hash = ? WHERE username = ?", (password_hash, username)
+        ))
+    return {"username": row[0], "role": row[2], "email": row[3], "first_use": row[4]}
+
+def verify_user(username, password, db_path=DB_PATH):
+    return authenticate(username, password, db_path) is not None
+
+# Zapis daty pierwszego użycia jednym zapytaniem (tylko gdy jeszcze jej nie ma)
+def update_first_use(username, db_path=DB_PATH):
+    now = datetime.now().isoformat()
+    _write(db_path, lambda conn: conn.execute(
+        "UPDATE users SET first_use = ? WHERE username = ? AND first_use IS NULL", (now, username)
+    ))
+
+def get_first_use(username, db_path=DB_PATH):
+    conn = get_connection(db_path)
+    row = conn.execute("SELECT first_use FROM users WHERE username = ?", (username,)).fetchone()
+    return row[0] if row else None
+
+# Jednorazowe przeniesienie użytkowników z users.csv (hasła jawnym tekstem) do tabeli users.
+# Istniejący użytkownicy nie są nadpisywani. Zwraca liczbę dodanych kont.
+def migrate_users_csv(csv_path, db_path=DB_PATH, rounds=None):
+    conn = get_connection(db_path)
+    if conn.execute("SELECT 1 FROM meta WHERE klucz = 'users_csv_migrated'").fetchone():
+        return 0
+    rows = []
+    if os.path.exists(csv_path):
+        with open(csv_path, encoding="utf-8", newline="") as f:
+            rows = [r for r in csv.DictReader(f) if r.get("username") and r.get("password") is not None]
+    # bcrypt zwalnia GIL, więc skróty liczymy równolegle
+    with ThreadPoolExecutor() as pool:
+        hashes = list(pool.map(lambda r: hash_password(r["password"], rounds), rows))
+
+    def job(conn):
+        cur = conn.executemany(
+            "INSERT OR IGNORE INTO users (username, password_hash, role) VALUES (?, ?, ?)",
+            [(r["username"], h, r.get("role") or "user") for r, h in zip(rows, hashes)]
+        )
+        conn.execute(
+            "INSERT OR IGNORE INTO meta (klucz, wartosc) VALUES ('users_csv_migrated', ?)",
+            (datetime.now().isoformat(),)
+        )
+        return cur.rowcount
+
+    return _write(db_path, job)
+
+def count_users(db_path=DB_PATH):
+    conn = get_connection(db_path)
+    return conn.execute("SELECT COUNT(*) FROM users").fetchone()[0]
+
+# Dzienne cele użytkownika: kalorie i opcjonalnie makroskładniki
+def get_goals(username, db_path=DB_PATH):
+    conn = get_connection(db_path)
+    row = conn.execute(
+        "SELECT kalorie, białko, tłuszcz, węglowodany FROM cele WHERE username = ?", (username,)
+    ).fetchone()
+    return dict(zip(DEFAULT_GOALS, row)) if row else dict(DEFAULT_GOALS)
+
+def set_goals(username, kalorie, białko=None, tłuszcz=None, węglowodany=None, db_path=DB_PATH):
+    _write(db_path, lambda conn: conn.execute(
+        "INSERT INTO cele (username, kalorie, białko, tłuszcz, węglowodany) VALUES (?, ?, ?, ?, ?) "
+        "ON CONFLICT (username) DO UPDATE SET kalorie = excluded.kalorie, białko = excluded.białko, "
+        "tłuszcz = excluded.tłuszcz, węglowodany = excluded.węglowodany",
+        (username, kalorie, białko, tłuszcz, węglowodany)
+    ))
@@ -0,0 +1,105 @@
+import queue
+import threading
+from concurrent.futures import Future
+
+import db
+
+# Najwięcej zapisów zatwierdzanych w jednej transakcji
+MAX_BATCH = 256
+
+# Jeden wątek zapisujący na plik bazy. Zapisy z wielu sesji trafiają do kolejki
+# i są zatwierdzane partiami (jeden COMMIT na partię), każdy we własnym SAVEPOINT,
+# więc błąd jednego zapisu nie wycofuje pozostałych.
+class Writer:
+    def __init__(self, db_path, init_schema=None, max_batch=MAX_BATCH):
+        self.db_path = db_path
+        self.init_schema = init_schema
+        self.max_batch = max_batch
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._stats = {"jobs": 0, "batches": 0, "errors": 0}
+        self._thread = threading.Thread(target=self._run, name=f"writer:{db_path}", daemon=True)
+        self._thread.start()
+
+    # Zlecenie zapisu: job(conn) wykonywany w transakcji wątku zapisującego.
+    # Future kończy się dopiero po zatwierdzeniu transakcji.
+    def submit(self, job):
+        future = Future()
+        self._queue.put((future, job))
+        return future
+
+    def _run(self):
+        conn = db.get_connection(self.db_path, self.init_schema)
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.max_batch:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            self._commit(conn, batch)
+
+    def _commit(self, conn, batch):
+        done = []
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            for future, job in batch:
+                if not future.set_running_or_notify_cancel():
+                    continue
+                conn.execute("SAVEPOINT zapis")
+                try:
+                    result = job(conn)
+                except Exception as e:
+                    conn.execute("ROLLBACK TO zapis")
+                    conn.execute("RELEASE zapis")
+                    done.append((future, None, e))
+                else:
+                    conn.execute("RELEASE zapis")
+                    done.append((future, result, None))
+            conn.commit()
+        except Exception as e:
+            if conn.in_transaction:
+                conn.rollback()
+            with self._lock:
+                self._stats["errors"] += len(batch)
+            for future, _ in batch:
+                if not future.done():
+                    if future.running() or future.set_running_or_notify_cancel():
+                        future.set_exception(e)
+            return
+        with self._lock:
+            self._stats["jobs"] += len(done)
+            self._stats["batches"] += 1
+            self._stats["errors"] += sum(1 for _, _, e in done if e is not None)
+        for future, result, error in done:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        stats["queued"] = self._queue.qsize()
+        stats["avg_batch"] = stats["jobs"] / stats["batches"] if stats["batches"] else 0.0
+        return stats
+
+_writers = {}
+_writers_lock = threading.Lock()
+
+def get_writer(db_path, init_schema=None):
+    with _writers_lock:
+        writer = _writers.get(db_path)
+        if writer is None:
+            writer = _writers[db_path] = Writer(db_path, init_schema)
+        return writer
+
+# Zapis przez wątek zapisujący danej bazy; czeka na zatwierdzenie i zwraca wynik job(conn)
+def write(db_path, job, init_schema=None):
+    return get_writer(db_path, init_schema).submit(job).result()
+
+# Statystyki wszystkich wątków zapisujących: ścieżka bazy -> stats()
+def stats():
+    with _writers_lock:
+        writers = dict(_writers)
+    return {db_path: writer.stats() for db_path, writer in writers.items()}